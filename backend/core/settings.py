@@ -52,6 +52,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'tasks.middleware.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'core.urls'
@@ -77,13 +78,50 @@ WSGI_APPLICATION = 'core.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite tuned for concurrent requests (compare with `manage.py
+# benchmark_sqlite`): WAL lets readers run alongside the single writer,
+# synchronous=NORMAL is durable across application crashes in WAL mode,
+# `timeout` is the busy timeout in seconds, and IMMEDIATE takes the write
+# lock when an atomic() block starts, so two writers queue on the busy
+# timeout instead of failing to upgrade a read lock ("database is locked").
+SQLITE_OPTIONS = {
+    'timeout': 20,
+    'transaction_mode': 'IMMEDIATE',
+    'init_command': (
+        'PRAGMA journal_mode=WAL;'
+        'PRAGMA synchronous=NORMAL;'
+        'PRAGMA mmap_size=268435456;'
+        'PRAGMA cache_size=-32000;'
+        'PRAGMA temp_store=MEMORY;'
+    ),
+}
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'OPTIONS': SQLITE_OPTIONS,
+    },
+    # A local read replica: a second SQLite file refreshed from the primary
+    # with `manage.py sync_replicas --interval 5`. Add 'replica' to
+    # DATABASE_REPLICAS below to route reads to it.
+    # 'replica': {
+    #     'ENGINE': 'django.db.backends.sqlite3',
+    #     'NAME': BASE_DIR / 'db-replica.sqlite3',
+    #     'OPTIONS': SQLITE_OPTIONS,
+    #     'TEST': {'MIRROR': 'default'},
+    # },
 }
 
+# Aliases that serve reads of safe requests (tasks.routers); writes, jobs
+# and management commands always use 'default'. After a write the user
+# reads from the primary for DATABASE_REPLICA_PIN_SECONDS; the pins live in
+# this cache alias, which must be shared when running several processes.
+DATABASE_REPLICAS = []
+DATABASE_REPLICA_PIN_SECONDS = 5
+DATABASE_REPLICA_PIN_CACHE = 'default'
+DATABASE_ROUTERS = ['tasks.routers.PrimaryReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -128,7 +166,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'tasks.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -156,3 +194,67 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
 AUTH_USER_MODEL = 'tasks.User'
+
+# Pub/sub used by the /api/tasks/events/ stream; the default only reaches
+# clients connected to the same process.
+TASK_EVENT_BROKER = 'tasks.events.InProcessBroker'
+
+# Part files of chunked attachment uploads (outside MEDIA_ROOT so they are
+# never served) and the largest upload accepted.
+TASK_UPLOAD_TEMP_DIR = BASE_DIR / 'upload_parts'
+TASK_UPLOAD_MAX_SIZE = 2 * 1024 ** 3
+# Uploads not resumed for this long are deleted by `manage.py purge_uploads`.
+TASK_UPLOAD_EXPIRY_HOURS = 24
+
+# Hand attachment downloads to the front server: None (Django streams the
+# file), 'x-accel-redirect' (nginx, internal location at the prefix below)
+# or 'x-sendfile' (Apache/lighttpd).
+TASK_MEDIA_ACCEL = None
+TASK_MEDIA_ACCEL_PREFIX = '/protected-media/'
+
+# Background jobs (tasks.jobs: attachment processing, queue rebalancing) run
+# only in a worker started with `manage.py run_jobs` next to the web server.
+# Set True to run them in-process right after commit instead (tests, or a
+# single-process deployment without a worker).
+TASK_JOBS_EAGER = False
+
+# Delta sync (tasks/changes/) remembers deleted and reassigned tasks this
+# long; `manage.py prune_tombstones` deletes older ones, and clients whose
+# ?since= is older must reload the full list.
+TASK_TOMBSTONE_RETENTION_DAYS = 30
+
+# The tasks/changes/ cursor lags the read by this many seconds so rows
+# stamped before a slow transaction commits are still delivered (longer
+# than any write transaction; clients dedupe by id).
+TASK_CHANGES_OVERLAP = 30
+
+# Full-text search backend for tasks (tasks.search); None picks one for the
+# database vendor: SQLite FTS5 or PostgreSQL tsvector.
+TASK_SEARCH_BACKEND = None
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Rendered task dicts (TaskSerializer fragments); least recently used
+    # entries are evicted beyond MAX_ENTRIES.
+    'fragments': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'task-fragments',
+        'TIMEOUT': 24 * 3600,
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+}
+
+# Cache alias and lifetime (seconds) of cached programmer names and the
+# programmer directory (tasks.directory); entries are also dropped by
+# signals whenever a User or Programmer changes.
+TASK_DIRECTORY_CACHE = 'default'
+TASK_DIRECTORY_CACHE_TIMEOUT = 3600
+
+# Cache alias holding rendered task fragments, keyed by id and updated_at.
+TASK_FRAGMENT_CACHE = 'fragments'
+
+# Seconds an authenticated user's row is reused from the in-process cache
+# (tasks.authentication.CachedJWTAuthentication) before it is read again.
+TASK_AUTH_USER_CACHE_TTL = 30
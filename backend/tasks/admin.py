@@ -1,6 +1,8 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from .models import Task, Programmer, TaskAttachment, User
+from .directory import programmer_full_name
+from .search import get_search_backend
 
 
 class TaskAttachmentInline(admin.TabularInline):
@@ -33,12 +35,20 @@ class TaskAdmin(admin.ModelAdmin):
     list_display = ('id', 'title', 'assigned_to',
                     'status', 'attachment_count', 'created_at')
     list_filter = ('status', 'assigned_to', 'created_at')
+    list_select_related = ('assigned_to__user',)
     search_fields = ('title', 'description')
     list_editable = ('status',)
     ordering = ('-created_at',)
     date_hierarchy = 'created_at'
     inlines = [TaskAttachmentInline]
 
+    def get_search_results(self, request, queryset, search_term):
+        # Full-text index instead of icontains scans over search_fields
+        if not search_term.strip():
+            return queryset, False
+        backend = get_search_backend(queryset.db)
+        return backend.filter(queryset, search_term), False
+
     def attachment_count(self, obj):
         return obj.attachments.count()
     attachment_count.short_description = 'Fayllar soni'
@@ -49,10 +59,7 @@ class ProgrammerAdmin(admin.ModelAdmin):
     list_display = ('id', 'get_user_name', 'phone_number')
 
     def get_user_name(self, obj):
-        try:
-            return obj.user.get_full_name()
-        except:
-            return "No User"
+        return programmer_full_name(obj.pk, default="No User")
     get_user_name.short_description = 'Foydalanuvchi'
 
 
@@ -0,0 +1,140 @@
+"""
+Cycle-time analytics computed in the database.
+
+``cycle_times(queryset)`` reduces a filtered Task queryset to the count,
+average and nearest-rank p50/p90 of each phase duration (in seconds),
+overall, per programmer and per week of ``created_at``, in one query: the
+queryset becomes a CTE, ``CUME_DIST()`` ranks every duration within its
+group and the outer query aggregates. Requires window functions (SQLite
+3.25+, PostgreSQL, MySQL 8).
+"""
+from django.db import connections
+from django.db.models import F, FloatField, Func
+from django.db.models.functions import TruncWeek
+
+# Metric name -> (start, end), as in TaskSerializer.get_duration_info
+METRICS = {
+    'pending_to_todo': ('pending_at', 'todo_at'),
+    'todo_to_done': ('todo_at', 'done_at'),
+    'done_to_approved': ('done_at', 'approved_at'),
+    'total_time': ('todo_at', 'approved_at'),
+}
+PERCENTILES = (50, 90)
+GROUPINGS = ('programmer', 'week')
+
+
+class Epoch(Func):
+    """A datetime as seconds since a fixed origin, as a float."""
+    template = 'EXTRACT(EPOCH FROM %(expressions)s)'
+    output_field = FloatField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return super().as_sql(
+            compiler, connection,
+            template='(julianday(%(expressions)s) * 86400.0)',
+            **extra_context)
+
+    def as_mysql(self, compiler, connection, **extra_context):
+        return super().as_sql(
+            compiler, connection, template='UNIX_TIMESTAMP(%(expressions)s)',
+            **extra_context)
+
+
+def seconds_between(start, end):
+    return Epoch(end) - Epoch(start)
+
+
+def _durations_sql(queryset):
+    """The filtered tasks as (programmer, week, <metric>...) rows."""
+    durations = {name: seconds_between(F(start), F(end))
+                 for name, (start, end) in METRICS.items()}
+    rows = queryset.order_by().annotate(
+        programmer=F('assigned_to_id'), week=TruncWeek('created_at'),
+        **durations,
+    ).values('programmer', 'week', *METRICS)
+    return rows.query.get_compiler(using=queryset.db).as_sql()
+
+
+def _build_sql(base_sql, connection):
+    qn = connection.ops.quote_name
+    unpivot = '\nUNION ALL\n'.join(
+        f"SELECT '{name}' AS metric, programmer, week, {qn(name)} AS seconds "
+        f"FROM base WHERE {qn(name)} IS NOT NULL"
+        for name in METRICS)
+    ranks = ',\n'.join(
+        ['CUME_DIST() OVER (PARTITION BY metric ORDER BY seconds) AS rank_all']
+        + [f'CUME_DIST() OVER (PARTITION BY metric, {group} ORDER BY seconds) '
+           f'AS rank_{group}' for group in GROUPINGS])
+
+    def aggregate(group):
+        rank = f'rank_{group or "all"}'
+        percentiles = ', '.join(
+            f'MIN(CASE WHEN {rank} >= {p / 100} THEN seconds END)'
+            for p in PERCENTILES)
+        keys = ', '.join(
+            column if column == group else f'NULL AS {column}'
+            for column in GROUPINGS)
+        group_by = f'metric, {group}' if group else 'metric'
+        return (f"SELECT '{group or 'all'}' AS level, metric, {keys}, "
+                f"COUNT(*), AVG(seconds), {percentiles} "
+                f"FROM ranked GROUP BY {group_by}")
+
+    return (f'WITH base AS ({base_sql}),\n'
+            f'durations AS ({unpivot}),\n'
+            f'ranked AS (SELECT metric, programmer, week, seconds,\n{ranks}\n'
+            f'FROM durations)\n'
+            + '\nUNION ALL\n'.join(
+                aggregate(group) for group in (None, *GROUPINGS)))
+
+
+def _week_key(value):
+    # SQLite returns the truncated datetime as text
+    if hasattr(value, 'date'):
+        value = value.date().isoformat()
+    return str(value)[:10]
+
+
+def _round(value):
+    return None if value is None else round(value, 1)
+
+
+def cycle_times(queryset):
+    """
+    ``{'overall': {...}, 'by_programmer': [...], 'by_week': [...]}`` where
+    each entry maps metric names to ``{count, avg, p50, p90}`` in seconds.
+    """
+    connection = connections[queryset.db]
+    base_sql, params = _durations_sql(queryset)
+    with connection.cursor() as cursor:
+        cursor.execute(_build_sql(base_sql, connection), params)
+        rows = cursor.fetchall()
+
+    def empty():
+        return {name: {'count': 0, 'avg': None,
+                       **{f'p{p}': None for p in PERCENTILES}}
+                for name in METRICS}
+
+    overall = empty()
+    groups = {group: {} for group in GROUPINGS}
+    for level, metric, programmer, week, count, avg, *percentiles in rows:
+        if level == 'all':
+            entry = overall
+        elif level == 'programmer':
+            entry = groups['programmer'].setdefault(programmer, empty())
+        else:
+            entry = groups['week'].setdefault(_week_key(week), empty())
+        entry[metric] = {
+            'count': count, 'avg': _round(avg),
+            **{f'p{p}': _round(value)
+               for p, value in zip(PERCENTILES, percentiles)},
+        }
+
+    return {
+        'overall': overall,
+        'by_programmer': [
+            {'programmer': key, **metrics} for key, metrics in sorted(
+                groups['programmer'].items(),
+                key=lambda item: (item[0] is None, item[0] or 0))],
+        'by_week': [{'week': key, **metrics}
+                    for key, metrics in sorted(groups['week'].items())],
+    }
@@ -0,0 +1,118 @@
+import threading
+import time
+
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from . import routers
+
+
+class UserCache:
+    """Thread-safe TTL map of user id -> row values, local to the process."""
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def set(self, key, values, ttl):
+        now = time.monotonic()
+        with self._lock:
+            if len(self._entries) >= self.maxsize:
+                self._entries = {k: e for k, e in self._entries.items()
+                                 if e[0] >= now}
+                if len(self._entries) >= self.maxsize:
+                    self._entries.clear()
+            self._entries[key] = (now + ttl, values)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that resolves the token's user id claim through
+    ``user_cache`` instead of a query per request.
+
+    Only ``cached_fields`` are loaded (others load lazily on access), for
+    ``TASK_AUTH_USER_CACHE_TTL`` seconds. Signals drop a user's entry when
+    the user changes in this process; other processes see the change once
+    their entry expires. Role checks therefore follow the database within
+    the TTL, not the claims baked into a day-long token.
+    """
+    cached_fields = ('id', 'username', 'first_name', 'last_name', 'email',
+                     'is_active', 'is_staff', 'is_superuser', 'is_programmer',
+                     'is_tester', 'is_manager', 'programmer_id')
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Needs the password hash on every request
+            user = super().get_user(validated_token)
+            routers.pin_recent_writer(user.pk)
+            return user
+        try:
+            # Claims hold the id as a string; signals key by str(pk) too
+            user_id = str(validated_token[api_settings.USER_ID_CLAIM])
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")) from e
+
+        # from_db expects the values in model field order
+        field_names = [f.attname for f in self.user_model._meta.concrete_fields
+                       if f.attname in self.cached_fields]
+        values = user_cache.get(user_id)
+        if values is None:
+            # Cached for the TTL, so never from a lagging replica
+            values = self.user_model.objects.using('default').filter(
+                **{api_settings.USER_ID_FIELD: user_id}
+            ).values_list(*field_names).first()
+            if values is None:
+                raise AuthenticationFailed(
+                    _("User not found"), code="user_not_found")
+            user_cache.set(user_id, values,
+                           getattr(settings, 'TASK_AUTH_USER_CACHE_TTL', 30))
+
+        user = self.user_model.from_db('default', field_names, values)
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        routers.pin_recent_writer(user.pk)
+        return user
+
+
+class QueryParamJWTAuthentication(CachedJWTAuthentication):
+    """
+    JWT authentication that also accepts ``?token=<access token>``.
+
+    Only for endpoints loaded by the browser itself (``<video src>``,
+    ``EventSource``), which cannot send an Authorization header.
+    """
+    query_param = 'token'
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is not None:
+            return super().authenticate(request)
+
+        raw_token = request.GET.get(self.query_param)
+        if not raw_token:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return self.get_user(validated_token), validated_token
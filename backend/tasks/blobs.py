@@ -0,0 +1,90 @@
+"""
+Content-addressed, reference-counted storage for attachment files.
+
+Identical uploads are stored once under ``tasks/blobs/<hash>`` and every
+TaskAttachment using them points at the same AttachmentBlob; generated
+thumbnails are stored the same way. Reference
+counts move with F() updates; a blob and its file are deleted after commit
+once no attachment uses it, as file or thumbnail, any more.
+"""
+import hashlib
+import os
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import AttachmentBlob
+
+
+def content_hash(fileobj):
+    hasher = hashlib.sha256()
+    fileobj.seek(0)
+    for chunk in iter(lambda: fileobj.read(64 * 1024), b''):
+        hasher.update(chunk)
+    fileobj.seek(0)
+    return hasher.hexdigest()
+
+
+def blob_name(digest, filename):
+    """Name relative to AttachmentBlob.file's upload_to (tasks/blobs/)."""
+    extension = os.path.splitext(filename)[1].lower()
+    return f"{digest[:2]}/{digest[2:4]}/{digest}{extension}"
+
+
+def acquire(digest, count=1):
+    """Add ``count`` references to an existing blob; ``False`` if it is gone."""
+    return bool(AttachmentBlob.objects.filter(sha256=digest).update(
+        ref_count=F('ref_count') + count))
+
+
+def store(fileobj, filename):
+    """
+    Return the blob for ``fileobj``'s content with one reference taken,
+    writing the file only if this content has not been stored before.
+    """
+    digest = content_hash(fileobj)
+    if not acquire(digest):
+        size = getattr(fileobj, 'size', None)
+        if size is None:
+            size = os.fstat(fileobj.fileno()).st_size
+        blob = AttachmentBlob(sha256=digest, size=size, ref_count=1)
+        blob.file.save(blob_name(digest, filename), fileobj, save=False)
+        try:
+            with transaction.atomic():
+                blob.save()
+            return blob
+        except IntegrityError:
+            # Stored concurrently by another request: use theirs.
+            blob.file.delete(save=False)
+            acquire(digest)
+    return AttachmentBlob.objects.get(sha256=digest)
+
+
+def share(blob_ids):
+    """Take one more reference on each blob in ``blob_ids`` (repeats add up)."""
+    counts = {}
+    for blob_id in blob_ids:
+        counts[blob_id] = counts.get(blob_id, 0) + 1
+    for blob_id, count in counts.items():
+        AttachmentBlob.objects.filter(pk=blob_id).update(
+            ref_count=F('ref_count') + count)
+
+
+def release(blob_id):
+    """Drop one reference; delete the blob after commit if it was the last."""
+    AttachmentBlob.objects.filter(pk=blob_id, ref_count__gt=0).update(
+        ref_count=F('ref_count') - 1)
+
+    def collect():
+        blob = AttachmentBlob.objects.filter(
+            pk=blob_id, ref_count=0, attachments__isnull=True,
+            thumbnail_attachments__isnull=True).first()
+        if blob is None:
+            return
+        name = blob.file.name
+        deleted, _ = AttachmentBlob.objects.filter(
+            pk=blob_id, ref_count=0).delete()
+        if deleted:
+            blob.file.storage.delete(name)
+
+    transaction.on_commit(collect)
@@ -0,0 +1,103 @@
+"""
+Cached programmer names and programmer directory.
+
+Names live on User, so showing "who is assigned" used to cost a User lookup
+per programmer per request. They are cached here per programmer, and the
+serialized ``programmers/`` list is cached as a whole, in the cache alias
+named by ``TASK_DIRECTORY_CACHE`` (local memory unless configured
+otherwise). Signals on User and Programmer call ``invalidate``; entries
+also expire after ``TASK_DIRECTORY_CACHE_TIMEOUT`` seconds as a backstop.
+Misses are filled from the primary, never from a read replica.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from . import routers
+
+# Versioned: bump when the cached values change shape
+NAME_KEY = 'tasks:programmer-name:2:{}'
+DIRECTORY_KEY = 'tasks:programmer-directory:2'
+
+
+def get_cache():
+    return caches[getattr(settings, 'TASK_DIRECTORY_CACHE', 'default')]
+
+
+def _timeout():
+    return getattr(settings, 'TASK_DIRECTORY_CACHE_TIMEOUT', 3600)
+
+
+def name_parts(programmer_ids):
+    """
+    ``{programmer_id: (first_name, last_name, username) or None}``; one
+    cache round trip, plus one query for the ids that were not cached.
+    """
+    from .models import User
+
+    cache = get_cache()
+    keys = {NAME_KEY.format(pk): pk for pk in set(programmer_ids)}
+    result = {keys[key]: value
+              for key, value in cache.get_many(list(keys)).items()}
+    missing = [pk for pk in keys.values() if pk not in result]
+    if missing:
+        # None marks a programmer without a linked user
+        fetched = dict.fromkeys(missing)
+        users = User.objects.using('default').filter(
+            programmer_id__in=missing,
+        ).values_list('programmer_id', 'first_name', 'last_name', 'username')
+        for programmer_id, *parts in users:
+            fetched[programmer_id] = tuple(parts)
+        cache.set_many({NAME_KEY.format(pk): value
+                        for pk, value in fetched.items()}, _timeout())
+        result.update(fetched)
+    return result
+
+
+def _name(programmer_id, parts):
+    if parts is None:
+        return f"Programmer {programmer_id}"
+    return f"{parts[0]} {parts[1]}"
+
+
+def programmer_name(programmer_id):
+    """Same text as ``str(programmer)``."""
+    return _name(programmer_id, name_parts([programmer_id])[programmer_id])
+
+
+def programmer_names(programmer_ids):
+    """``programmer_name`` for many programmers with one ``name_parts`` call."""
+    return {pk: _name(pk, parts)
+            for pk, parts in name_parts(programmer_ids).items()}
+
+
+def programmer_full_name(programmer_id, default=None):
+    """Same text as ``user.get_full_name()``, ``default`` without a user."""
+    parts = name_parts([programmer_id])[programmer_id]
+    if parts is None:
+        return f"Programmer {programmer_id}" if default is None else default
+    return f"{parts[0]} {parts[1]}".strip() or parts[2]
+
+
+def programmer_directory(build):
+    """The cached ``programmers/`` list, built with ``build()`` on a miss."""
+    cache = get_cache()
+    entry = cache.get(DIRECTORY_KEY)
+    if entry is None:
+        with routers.primary_reads():
+            entry = build()
+        cache.set(DIRECTORY_KEY, entry, _timeout())
+    return entry
+
+
+def invalidate(programmer_id=None):
+    """
+    Drop the directory and the programmer's name now and again after the
+    transaction commits, so a reader that refilled the cache from the old
+    rows in between does not keep them.
+    """
+    keys = [DIRECTORY_KEY]
+    if programmer_id is not None:
+        keys.append(NAME_KEY.format(programmer_id))
+    get_cache().delete_many(keys)
+    transaction.on_commit(lambda: get_cache().delete_many(keys))
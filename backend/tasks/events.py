@@ -0,0 +1,96 @@
+import asyncio
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+
+class Subscription:
+    """One connected client: a bounded queue owned by its event loop."""
+
+    def __init__(self, loop, predicate, maxsize=100):
+        self.loop = loop
+        self.predicate = predicate
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def push(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow consumer: drop the event, the client can resync via
+            # tasks/changes/.
+            pass
+
+
+class InProcessBroker:
+    """
+    Fan-out of task events to subscribers of this process.
+
+    Each idle subscriber costs one small asyncio queue, so thousands of
+    connections per process are fine. Events published from other processes
+    are not seen; point ``TASK_EVENT_BROKER`` at a shared implementation
+    with the same ``subscribe``/``unsubscribe``/``publish`` interface for
+    multi-process deployments.
+    """
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, predicate):
+        subscription = Subscription(asyncio.get_running_loop(), predicate)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            if not subscription.predicate(event):
+                continue
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    subscription.push, event)
+            except RuntimeError:
+                # The client's loop is already closed.
+                self.unsubscribe(subscription)
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        path = getattr(settings, 'TASK_EVENT_BROKER',
+                       'tasks.events.InProcessBroker')
+        _broker = import_string(path)()
+    return _broker
+
+
+def publish_task_event(task, event_type):
+    """Publish a task event once the current transaction commits."""
+    event = {
+        'event': event_type,
+        'task': task.pk,
+        'status': task.status,
+        'assigned_to': task.assigned_to_id,
+        'at': timezone.now().isoformat(),
+    }
+    transaction.on_commit(lambda: get_broker().publish(event))
+
+
+def visible_to(user):
+    """Predicate limiting a stream to the events ``user`` may see."""
+    if user.is_staff:
+        return lambda event: True
+    programmer_id = user.programmer_id
+    return lambda event: (programmer_id is not None
+                          and event['assigned_to'] == programmer_id)
@@ -0,0 +1,71 @@
+import datetime
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .models import Task
+
+
+class TaskFilterBackend(BaseFilterBackend):
+    """
+    SQL-side filtering for the task list.
+
+    Query parameters:
+        status          one or more statuses, comma separated (TODO,DONE)
+        assigned_to     programmer id
+        created_after   ISO date/datetime, inclusive
+        created_before  ISO date/datetime, exclusive
+        updated_after   ISO date/datetime, inclusive
+        updated_before  ISO date/datetime, exclusive
+    """
+    date_params = {
+        'created_after': 'created_at__gte',
+        'created_before': 'created_at__lt',
+        'updated_after': 'updated_at__gte',
+        'updated_before': 'updated_at__lt',
+    }
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+
+        statuses = params.get('status')
+        if statuses:
+            statuses = [s.strip().upper() for s in statuses.split(',') if s.strip()]
+            valid = dict(Task.STATUS_CHOICES)
+            invalid = [s for s in statuses if s not in valid]
+            if invalid:
+                raise ValidationError(
+                    {'status': f"Noma'lum status: {', '.join(invalid)}"})
+            queryset = queryset.filter(status__in=statuses)
+
+        assigned_to = params.get('assigned_to')
+        if assigned_to:
+            try:
+                queryset = queryset.filter(assigned_to_id=int(assigned_to))
+            except ValueError:
+                raise ValidationError(
+                    {'assigned_to': 'Programmist id raqam bo\'lishi kerak'})
+
+        for param, lookup in self.date_params.items():
+            value = params.get(param)
+            if value:
+                queryset = queryset.filter(
+                    **{lookup: self.parse_moment(param, value)})
+
+        return queryset
+
+    def parse_moment(self, param, value):
+        try:
+            moment = parse_datetime(value)
+            if moment is None:
+                day = parse_date(value)
+                if day is None:
+                    raise ValueError(value)
+                moment = datetime.datetime.combine(day, datetime.time.min)
+        except ValueError:
+            raise ValidationError({param: 'Sana formati noto\'g\'ri'})
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
@@ -0,0 +1,150 @@
+"""
+Database-backed background jobs.
+
+``enqueue`` stores a call to a module-level function in the Job table, in
+the caller's transaction, so a job exists only if the work that produced it
+was committed. ``manage.py run_jobs`` claims due jobs by priority and runs
+them in a thread or process pool. Failed jobs are retried with exponential
+backoff up to ``max_attempts``.
+
+Nothing runs them unless a ``run_jobs`` worker is started. With
+``TASK_JOBS_EAGER = True`` jobs run in-process right after commit instead,
+which is convenient for tests and single-process setups.
+"""
+import logging
+import os
+import socket
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VISIBILITY_TIMEOUT = timedelta(minutes=5)
+
+
+def _func_path(func):
+    if isinstance(func, str):
+        return func
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def enqueue(func, priority=0, delay=None, max_attempts=3, **kwargs):
+    """Queue ``func(**kwargs)``; ``kwargs`` must be JSON serializable."""
+    job = Job.objects.create(
+        func=_func_path(func), kwargs=kwargs, priority=priority,
+        max_attempts=max_attempts,
+        run_at=timezone.now() + (delay or timedelta()))
+    if getattr(settings, 'TASK_JOBS_EAGER', False):
+        transaction.on_commit(lambda: run_job(job.pk, mark_running=True))
+    return job
+
+
+def enqueue_many(func, kwargs_list, priority=0, max_attempts=3):
+    """Queue one call per kwargs dict with a single bulk insert."""
+    now = timezone.now()
+    created = Job.objects.bulk_create([
+        Job(func=_func_path(func), kwargs=kwargs, priority=priority,
+            max_attempts=max_attempts, run_at=now)
+        for kwargs in kwargs_list
+    ])
+    if getattr(settings, 'TASK_JOBS_EAGER', False):
+        job_ids = [job.pk for job in created]
+        transaction.on_commit(
+            lambda: [run_job(pk, mark_running=True) for pk in job_ids])
+    return created
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim(limit, worker, visibility_timeout=DEFAULT_VISIBILITY_TIMEOUT):
+    """
+    Claim up to ``limit`` due jobs for ``worker``. Each claim is a
+    conditional UPDATE, so two workers never get the same job.
+
+    A RUNNING job whose lease expired lost its worker; it is retried while
+    it has attempts left and marked FAILED otherwise, so a job that kills
+    its worker (e.g. out of memory) does not loop forever.
+    """
+    now = timezone.now()
+    expired = Q(status='RUNNING', locked_until__lt=now)
+    Job.objects.filter(expired, attempts__gte=F('max_attempts')).update(
+        status='FAILED', locked_until=None, finished_at=now,
+        last_error='Worker lost: lease expired on the last attempt')
+    due = (Q(status='QUEUED', run_at__lte=now)
+           | (expired & Q(attempts__lt=F('max_attempts'))))
+    candidates = Job.objects.filter(due).order_by(
+        '-priority', 'run_at').values('pk', 'status', 'locked_until')[:limit * 2]
+
+    claimed = []
+    for candidate in candidates:
+        updated = Job.objects.filter(
+            pk=candidate['pk'], status=candidate['status'],
+            locked_until=candidate['locked_until'],
+        ).update(status='RUNNING', locked_by=worker,
+                 locked_until=now + visibility_timeout,
+                 attempts=F('attempts') + 1)
+        if updated:
+            claimed.append(candidate['pk'])
+            if len(claimed) == limit:
+                break
+    return claimed
+
+
+def run_job(job_id, mark_running=False,
+            visibility_timeout=DEFAULT_VISIBILITY_TIMEOUT):
+    """
+    Execute one claimed job and record the outcome. ``mark_running`` claims
+    a queued job first, with the same lease as ``claim``, so a worker picks
+    it up again if this process dies before finishing it.
+    """
+    if mark_running:
+        claimed = Job.objects.filter(pk=job_id, status='QUEUED').update(
+            status='RUNNING', attempts=F('attempts') + 1,
+            locked_by=worker_name(),
+            locked_until=timezone.now() + visibility_timeout)
+        if not claimed:
+            return False
+    job = Job.objects.get(pk=job_id)
+    try:
+        import_string(job.func)(**job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        logger.warning('Job %s (%s) failed, attempt %s/%s', job.pk, job.func,
+                       job.attempts, job.max_attempts)
+        if job.attempts < job.max_attempts:
+            Job.objects.filter(pk=job.pk).update(
+                status='QUEUED', last_error=error, locked_until=None,
+                run_at=timezone.now() + timedelta(seconds=2 ** job.attempts))
+        else:
+            Job.objects.filter(pk=job.pk).update(
+                status='FAILED', last_error=error, locked_until=None,
+                finished_at=timezone.now())
+        return False
+    Job.objects.filter(pk=job.pk).update(
+        status='DONE', locked_until=None, finished_at=timezone.now())
+    return True
+
+
+def run_job_in_worker(job_id):
+    """Pool entry point: each pool thread/process uses its own connection."""
+    try:
+        return run_job(job_id)
+    finally:
+        connection.close()
+
+
+def purge(older_than=timedelta(days=7)):
+    """Delete finished jobs older than ``older_than``."""
+    cutoff = timezone.now() - older_than
+    return Job.objects.filter(
+        status='DONE', finished_at__lt=cutoff).delete()[0]
@@ -0,0 +1,113 @@
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+from django.utils import timezone
+
+from tasks.models import Programmer, Task
+
+PROFILES = {
+    'default': {},
+    'tuned': settings.SQLITE_OPTIONS,
+}
+
+
+def _read(alias, task_ids):
+    list(Task.objects.using(alias)
+         .order_by('queue_order', '-created_at')
+         .values_list('id', 'title', 'status', 'assigned_to_id')[:50])
+
+
+def _write(alias, task_ids):
+    # Read-then-write in one transaction, like the transition endpoints
+    pk = random.choice(task_ids)
+    with transaction.atomic(using=alias):
+        tasks = Task.objects.using(alias).filter(pk=pk)
+        tasks.values_list('status', flat=True).first()
+        tasks.update(title=f'Task {pk} {random.random()}',
+                     updated_at=timezone.now())
+
+
+class Command(BaseCommand):
+    help = ("Measure read and write throughput of the default and the tuned "
+            "SQLite profile (settings.SQLITE_OPTIONS) at N concurrent clients, "
+            "on a scratch database.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', default='1,4,16',
+                            help="Comma separated client counts (default 1,4,16).")
+        parser.add_argument('--seconds', type=float, default=3.0,
+                            help="Duration of each measurement.")
+        parser.add_argument('--tasks', type=int, default=5000,
+                            help="Tasks seeded into each scratch database.")
+
+    def handle(self, *args, **options):
+        clients = [int(n) for n in options['clients'].split(',')]
+        directory = tempfile.mkdtemp(prefix='benchmark-sqlite-')
+        try:
+            self.stdout.write(f"{'profile':<8} {'clients':>7} {'reads/s':>10} "
+                              f"{'writes/s':>10} {'locked':>7}")
+            for profile, db_options in PROFILES.items():
+                alias = f'benchmark_{profile}'
+                self._setup(alias, os.path.join(directory, f'{profile}.sqlite3'),
+                            db_options, options['tasks'])
+                task_ids = list(Task.objects.using(alias).values_list('pk', flat=True))
+                for count in clients:
+                    reads, _ = self._run(alias, _read, task_ids, count,
+                                         options['seconds'])
+                    writes, locked = self._run(alias, _write, task_ids, count,
+                                               options['seconds'])
+                    self.stdout.write(f"{profile:<8} {count:>7} {reads:>10.0f} "
+                                      f"{writes:>10.0f} {locked:>7}")
+                connections[alias].close()
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def _setup(self, alias, path, db_options, task_count):
+        databases = {**connections.settings, alias: {
+            'ENGINE': 'django.db.backends.sqlite3', 'NAME': path,
+            'OPTIONS': db_options,
+        }}
+        connections.settings[alias] = connections.configure_settings(
+            databases)[alias]
+        call_command('migrate', database=alias, verbosity=0)
+        programmers = Programmer.objects.using(alias).bulk_create(
+            [Programmer() for _ in range(10)])
+        Task.objects.using(alias).bulk_create([
+            Task(title=f'Task {i}', description='Benchmark task ' * 20,
+                 assigned_to=programmers[i % len(programmers)],
+                 queue_order=(i + 1) * Task.QUEUE_GAP)
+            for i in range(task_count)
+        ], batch_size=500)
+
+    def _run(self, alias, operation, task_ids, count, seconds):
+        """``(operations per second, 'database is locked' errors)``."""
+        done, locked = [0] * count, [0] * count
+        deadline = time.monotonic() + seconds
+
+        def client(index):
+            try:
+                while time.monotonic() < deadline:
+                    try:
+                        operation(alias, task_ids)
+                        done[index] += 1
+                    except OperationalError as exc:
+                        if 'locked' not in str(exc):
+                            raise
+                        locked[index] += 1
+            finally:
+                connections[alias].close()
+
+        threads = [threading.Thread(target=client, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return sum(done) / seconds, sum(locked)
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from tasks.media import process_attachment
+from tasks.models import TaskAttachment
+
+
+class Command(BaseCommand):
+    help = "Generate thumbnails and metadata for unprocessed attachments."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--failed', action='store_true',
+                            help="Also retry attachments that failed before.")
+
+    def handle(self, *args, **options):
+        statuses = ['PENDING', 'FAILED'] if options['failed'] else ['PENDING']
+        attachments = TaskAttachment.objects.filter(
+            processing_status__in=statuses).exclude(file='')
+        count = 0
+        for attachment in attachments.iterator():
+            try:
+                process_attachment(attachment.pk)
+            except Exception:
+                pass  # recorded as FAILED on the attachment
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"{count} ta fayl qayta ishlandi."))
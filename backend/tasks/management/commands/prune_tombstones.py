@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tasks.models import TaskTombstone
+
+
+class Command(BaseCommand):
+    help = ("Delete delta-sync tombstones older than the retention period "
+            "(settings.TASK_TOMBSTONE_RETENTION_DAYS). Run it daily.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int,
+            default=getattr(settings, 'TASK_TOMBSTONE_RETENTION_DAYS', 30),
+            help="Keep tombstones from the last N days.")
+
+    def handle(self, *args, **options):
+        deleted = TaskTombstone.prune(timedelta(days=options['days']))
+        self.stdout.write(self.style.SUCCESS(
+            f"{deleted} ta eski tombstone o'chirildi."))
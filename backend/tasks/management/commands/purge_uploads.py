@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from tasks.models import AttachmentUpload
+
+
+class Command(BaseCommand):
+    help = ("Delete chunked uploads not resumed within "
+            "settings.TASK_UPLOAD_EXPIRY_HOURS, and orphaned part files. "
+            "Run it periodically.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours', type=int,
+            default=getattr(settings, 'TASK_UPLOAD_EXPIRY_HOURS', 24),
+            help="Keep uploads resumed within the last N hours.")
+
+    def handle(self, *args, **options):
+        deleted = AttachmentUpload.purge_stale(timedelta(hours=options['hours']))
+        self.stdout.write(self.style.SUCCESS(
+            f"{deleted} ta tugallanmagan yuklash o'chirildi."))
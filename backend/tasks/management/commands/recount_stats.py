@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from tasks.models import ProgrammerStats
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-programmer task counters from the Task table."
+
+    def handle(self, *args, **options):
+        ProgrammerStats.recount()
+        self.stdout.write(self.style.SUCCESS("Statistika qayta hisoblandi."))
@@ -0,0 +1,71 @@
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from tasks import jobs
+
+
+def _close_connections():
+    # Forked workers must not share the parent's database connections.
+    connections.close_all()
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs from the database."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4,
+                            help="Jobs run at the same time (default 4).")
+        parser.add_argument('--pool', choices=('thread', 'process'),
+                            default='thread',
+                            help="Run jobs in threads or worker processes.")
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help="Seconds to sleep when no job is due.")
+        parser.add_argument('--visibility-timeout', type=int, default=300,
+                            help="Seconds before an unfinished job is retried "
+                                 "by another worker.")
+        parser.add_argument('--once', action='store_true',
+                            help="Exit when no job is due.")
+
+    def handle(self, *args, **options):
+        concurrency = options['concurrency']
+        timeout = timedelta(seconds=options['visibility_timeout'])
+        worker = jobs.worker_name()
+
+        if options['pool'] == 'process':
+            _close_connections()
+            executor = ProcessPoolExecutor(
+                max_workers=concurrency, initializer=_close_connections)
+        else:
+            executor = ThreadPoolExecutor(max_workers=concurrency)
+
+        stopping = []
+        signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+
+        running = set()
+        self.stdout.write(f"Worker {worker} started ({options['pool']} x {concurrency}).")
+        try:
+            while not stopping:
+                free = concurrency - len(running)
+                claimed = jobs.claim(free, worker, timeout) if free else []
+                for job_id in claimed:
+                    running.add(executor.submit(jobs.run_job_in_worker, job_id))
+
+                if not running:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+                done, running = wait(
+                    running, timeout=options['poll_interval'],
+                    return_when=FIRST_COMPLETED)
+                running = set(running)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            executor.shutdown(wait=True)
+            self.stdout.write(f"Worker {worker} stopped.")
@@ -0,0 +1,41 @@
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from tasks.routers import get_replicas
+
+
+class Command(BaseCommand):
+    help = ("Copy the primary SQLite database into every SQLite replica in "
+            "DATABASE_REPLICAS. Stands in for real replication when trying "
+            "replicas locally with two database files.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0,
+                            help="Repeat every N seconds instead of copying once.")
+
+    def handle(self, *args, **options):
+        replicas = get_replicas()
+        if not replicas:
+            raise CommandError("DATABASE_REPLICAS bo'sh.")
+        for alias in ['default', *replicas]:
+            if connections[alias].vendor != 'sqlite':
+                raise CommandError(f"{alias} SQLite emas; replikatsiyani ma'lumotlar bazasining o'zi bajaradi.")
+
+        while True:
+            source = connections['default']
+            source.ensure_connection()
+            for alias in replicas:
+                connections[alias].close()
+                target = sqlite3.connect(connections[alias].settings_dict['NAME'])
+                try:
+                    # Online backup: a consistent snapshot, writers keep going
+                    source.connection.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(f"{alias} yangilandi.")
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
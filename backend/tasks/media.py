@@ -0,0 +1,136 @@
+"""
+Background processing of TaskAttachment files.
+
+Thumbnails and metadata are computed by ``process_attachment`` jobs (see
+tasks.jobs), off the request path. Image decoding is CPU bound, so run the
+worker with ``--pool process`` when many uploads arrive at once.
+"""
+import io
+import json
+import logging
+import os
+import shutil
+import subprocess
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZE = (320, 320)
+
+
+def _image_thumbnail(source):
+    from PIL import Image
+
+    with Image.open(source) as image:
+        width, height = image.size
+        image.thumbnail(THUMBNAIL_SIZE)
+        if image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG', quality=80)
+    return buffer.getvalue(), width, height
+
+
+def _probe(path):
+    """Duration and frame size via ffprobe, if it is installed."""
+    if not shutil.which('ffprobe'):
+        return {}
+    result = subprocess.run(
+        ['ffprobe', '-v', 'error', '-print_format', 'json',
+         '-show_entries', 'format=duration:stream=width,height', path],
+        capture_output=True, timeout=60, check=True)
+    info = json.loads(result.stdout or b'{}')
+    data = {}
+    duration = info.get('format', {}).get('duration')
+    if duration:
+        data['duration'] = float(duration)
+    for stream in info.get('streams', []):
+        if stream.get('width'):
+            data['width'], data['height'] = stream['width'], stream['height']
+            break
+    return data
+
+
+def _video_frame(path):
+    """A JPEG frame one second in, via ffmpeg, if it is installed."""
+    if not shutil.which('ffmpeg'):
+        return None
+    result = subprocess.run(
+        ['ffmpeg', '-v', 'error', '-ss', '1', '-i', path, '-frames:v', '1',
+         '-f', 'image2', '-c:v', 'mjpeg', 'pipe:1'],
+        capture_output=True, timeout=60)
+    return result.stdout or None
+
+
+def analyze(path, file_type):
+    """Runs in a worker process. Returns metadata and thumbnail bytes."""
+    data = {'size': os.path.getsize(path)}
+    if file_type == 'IMAGE':
+        data['thumbnail'], data['width'], data['height'] = _image_thumbnail(path)
+    else:
+        data.update(_probe(path))
+        if file_type == 'VIDEO':
+            frame = _video_frame(path)
+            if frame:
+                data['thumbnail'] = _image_thumbnail(io.BytesIO(frame))[0]
+    return data
+
+
+def store_result(attachment_id, data=None, error=None):
+    """Save worker output on the attachment (runs in the parent process)."""
+    from . import blobs
+    from .models import TaskAttachment
+
+    with transaction.atomic():
+        # Locked so a concurrent delete cannot miss the thumbnail reference
+        attachment = TaskAttachment.objects.select_for_update().filter(
+            pk=attachment_id).first()
+        if attachment is None:
+            return
+        if error is not None:
+            logger.warning('Media processing failed for attachment %s: %s',
+                           attachment_id, error)
+            attachment.processing_status = 'FAILED'
+        else:
+            thumbnail = data.pop('thumbnail', None)
+            if thumbnail:
+                if attachment.thumbnail_blob_id:
+                    blobs.release(attachment.thumbnail_blob_id)
+                blob = blobs.store(ContentFile(thumbnail), 'thumbnail.jpg')
+                attachment.thumbnail_blob = blob
+                attachment.thumbnail = blob.file.name
+            for field, value in data.items():
+                setattr(attachment, field, value)
+            attachment.processing_status = 'DONE'
+        attachment.processed_at = timezone.now()
+        # post_save bumps the task's updated_at (tasks.signals)
+        attachment.save(update_fields=[
+            'thumbnail', 'thumbnail_blob', 'width', 'height', 'duration',
+            'size', 'processing_status', 'processed_at'])
+
+
+def process_attachment(attachment_id):
+    """Job: analyze one attachment and store the result."""
+    from .models import TaskAttachment
+
+    attachment = TaskAttachment.objects.filter(pk=attachment_id).first()
+    if attachment is None or not attachment.file:
+        return
+    try:
+        data = analyze(attachment.file.path, attachment.file_type)
+    except Exception as exc:
+        store_result(attachment_id, error=exc)
+        raise
+    store_result(attachment_id, data)
+
+
+def schedule_processing(attachments):
+    """Queue thumbnail/metadata extraction for new attachments."""
+    from . import jobs
+
+    jobs.enqueue_many(process_attachment, [
+        {'attachment_id': attachment.pk}
+        for attachment in attachments if attachment.file])
@@ -0,0 +1,28 @@
+from . import routers
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Lets safe requests read from replicas (tasks.routers) and remembers the
+    authors of unsafe ones, whose next reads then stay on the primary.
+    """
+    safe_methods = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        replicas = bool(routers.get_replicas())
+        token = routers.use_replicas(
+            replicas and request.method in self.safe_methods)
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.reset_replicas(token)
+
+        if replicas and request.method not in self.safe_methods:
+            # DRF puts the authenticated user back on the Django request
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_authenticated:
+                routers.remember_write(user.pk)
+        return response
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.11 on 2026-10-18 19:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_add_rejection_reason_queue_order'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assigned_to', 'queue_order', '-created_at'], name='task_assignee_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['queue_order', '-created_at'], name='task_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-18 19:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_task_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='programmer',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+QUEUE_GAP = 1024
+
+
+def spread_queue_order(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    tasks_db = Task.objects.using(schema_editor.connection.alias)
+    programmer_ids = tasks_db.values_list(
+        'assigned_to_id', flat=True).distinct()
+    for programmer_id in programmer_ids:
+        tasks = list(tasks_db.filter(assigned_to_id=programmer_id)
+                     .order_by('queue_order', '-created_at', '-id')
+                     .only('id', 'queue_order'))
+        for position, task in enumerate(tasks, start=1):
+            task.queue_order = position * QUEUE_GAP
+        tasks_db.bulk_update(tasks, ['queue_order'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_task_tombstone'),
+    ]
+
+    operations = [
+        migrations.RunPython(spread_queue_order, migrations.RunPython.noop),
+    ]
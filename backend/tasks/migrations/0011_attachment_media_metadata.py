@@ -0,0 +1,48 @@
+# Generated by Django 5.2.11 on 2026-10-18 19:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0010_attachment_upload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskattachment',
+            name='duration',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='taskattachment',
+            name='height',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='taskattachment',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='taskattachment',
+            name='processing_status',
+            field=models.CharField(choices=[('PENDING', 'Kutilmoqda'), ('DONE', 'Tayyor'), ('FAILED', 'Xato')], default='PENDING', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='taskattachment',
+            name='size',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='taskattachment',
+            name='thumbnail',
+            field=models.FileField(blank=True, null=True, upload_to='tasks/thumbnails/'),
+        ),
+        migrations.AddField(
+            model_name='taskattachment',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
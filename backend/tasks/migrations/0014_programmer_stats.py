@@ -0,0 +1,41 @@
+# Generated by Django 5.2.11 on 2026-10-18 19:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def count_tasks(apps, schema_editor):
+    Programmer = apps.get_model('tasks', 'Programmer')
+    ProgrammerStats = apps.get_model('tasks', 'ProgrammerStats')
+    Task = apps.get_model('tasks', 'Task')
+    db = schema_editor.connection.alias
+    rows = {pk: ProgrammerStats(programmer_id=pk)
+            for pk in Programmer.objects.using(db).values_list('pk', flat=True)}
+    grouped = (Task.objects.using(db).values('assigned_to_id', 'status')
+               .annotate(count=models.Count('id')).order_by())
+    for row in grouped:
+        setattr(rows[row['assigned_to_id']], row['status'].lower(), row['count'])
+    ProgrammerStats.objects.using(db).bulk_create(rows.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0013_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProgrammerStats',
+            fields=[
+                ('programmer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='tasks.programmer')),
+                ('pending', models.IntegerField(default=0)),
+                ('todo', models.IntegerField(default=0)),
+                ('done', models.IntegerField(default=0)),
+                ('approved', models.IntegerField(default=0)),
+                ('rejected', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(count_tasks, migrations.RunPython.noop),
+    ]
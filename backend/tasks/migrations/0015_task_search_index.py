@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+def install_index(apps, schema_editor):
+    from tasks.search import get_search_backend
+
+    backend = get_search_backend(schema_editor.connection.alias)
+    backend.install(schema_editor, apps.get_model('tasks', 'Task'))
+
+
+def remove_index(apps, schema_editor):
+    from tasks.search import get_search_backend
+
+    backend = get_search_backend(schema_editor.connection.alias)
+    backend.uninstall(schema_editor, apps.get_model('tasks', 'Task'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0014_programmer_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_index, remove_index),
+    ]
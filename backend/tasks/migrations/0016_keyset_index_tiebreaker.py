@@ -0,0 +1,29 @@
+# Generated by Django 5.2.11 on 2026-10-18 19:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0015_task_search_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_assignee_queue_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_queue_idx',
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assigned_to', 'queue_order', '-created_at', '-id'], name='task_assignee_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['queue_order', '-created_at', '-id'], name='task_queue_idx'),
+        ),
+    ]
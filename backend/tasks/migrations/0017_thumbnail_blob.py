@@ -0,0 +1,57 @@
+# Generated by Django 5.2.11 on 2026-10-18 20:40
+
+import hashlib
+
+import django.db.models.deletion
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+
+def adopt_thumbnails(apps, schema_editor):
+    """
+    Turn existing thumbnail files into blobs, one reference per attachment
+    using them (rework copies share their original's file). Missing files
+    are left alone.
+    """
+    AttachmentBlob = apps.get_model('tasks', 'AttachmentBlob')
+    TaskAttachment = apps.get_model('tasks', 'TaskAttachment')
+    db = schema_editor.connection.alias
+    grouped = (TaskAttachment.objects.using(db)
+               .filter(thumbnail_blob__isnull=True)
+               .exclude(thumbnail__isnull=True).exclude(thumbnail='')
+               .values('thumbnail').annotate(count=models.Count('id'))
+               .order_by())
+    for row in grouped:
+        name = row['thumbnail']
+        if not default_storage.exists(name):
+            continue
+        with default_storage.open(name) as fileobj:
+            digest = hashlib.sha256(fileobj.read()).hexdigest()
+        blob = AttachmentBlob.objects.using(db).filter(sha256=digest).first()
+        if blob is None:
+            blob = AttachmentBlob.objects.using(db).create(
+                sha256=digest, file=name, size=default_storage.size(name),
+                ref_count=row['count'])
+        else:
+            AttachmentBlob.objects.using(db).filter(pk=blob.pk).update(
+                ref_count=models.F('ref_count') + row['count'])
+        TaskAttachment.objects.using(db).filter(thumbnail=name).update(
+            thumbnail_blob=blob, thumbnail=blob.file.name)
+        if blob.file.name != name:
+            default_storage.delete(name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0016_keyset_index_tiebreaker'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskattachment',
+            name='thumbnail_blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='thumbnail_attachments', to='tasks.attachmentblob'),
+        ),
+        migrations.RunPython(adopt_thumbnails, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,88 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified validators for ``list`` and ``retrieve``.
+
+    Validators are computed before serialization, so a matching
+    ``If-None-Match`` or ``If-Modified-Since`` gets a 304 without running
+    the serializer. Subclasses implement ``get_list_validators`` (whole
+    list, one aggregate query), ``get_object_validators`` and optionally
+    ``get_page_validators`` (one keyset page, from the fetched rows), all
+    returning ``(last_modified, version_parts)``.
+
+    Lists return ``None`` for last_modified: a timestamp cannot tell that a
+    row was deleted or left the filter, so lists are validated by ETag only.
+    """
+    representation_version = 1
+
+    def get_list_validators(self, queryset):
+        raise NotImplementedError
+
+    def get_page_validators(self, page):
+        parts = [self.get_object_validators(obj)[1] for obj in page]
+        return None, parts
+
+    def get_object_validators(self, obj):
+        raise NotImplementedError
+
+    def build_etag(self, request, parts):
+        parts = [self.representation_version, request.get_full_path(),
+                 request.user.pk, *parts]
+        digest = hashlib.md5(
+            '|'.join(str(p) for p in parts).encode(), usedforsecurity=False)
+        return quote_etag(digest.hexdigest())
+
+    def conditional_response(self, request, validators, render):
+        last_modified, parts = validators
+        etag = self.build_etag(request, parts)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(
+            request._request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = render()
+
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+            response['Cache-Control'] = 'private, no-cache'
+            patch_vary_headers(response, ('Authorization',))
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            validators = self.get_list_validators(queryset)
+            objects = queryset
+        else:
+            # Only the fetched page is validated; the cursor is in the URL
+            # and so already in the ETag.
+            last_modified, parts = self.get_page_validators(page)
+            validators = last_modified, [*parts, self.paginator.has_next]
+            objects = page
+
+        def render():
+            serializer = self.get_serializer(objects, many=True)
+            if page is None:
+                return Response(serializer.data)
+            return self.get_paginated_response(serializer.data)
+
+        return self.conditional_response(request, validators, render)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+
+        def render():
+            serializer = self.get_serializer(instance)
+            return Response(serializer.data)
+
+        return self.conditional_response(
+            request, self.get_object_validators(instance), render)
@@ -1,5 +1,13 @@
-from django.db import models
+import os
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
+from django.utils import timezone
+
+from .events import publish_task_event
 
 
 class Task(models.Model):
@@ -23,7 +31,8 @@ class Task(models.Model):
     # Rejection reason
     rejection_reason = models.TextField(null=True, blank=True)
 
-    # Queue position for ordering tasks for a programmer
+    # Queue position for ordering tasks for a programmer. Keys are spaced by
+    # QUEUE_GAP so a move only rewrites the moved row.
     queue_order = models.PositiveIntegerField(default=0)
 
     # Time tracking
@@ -33,9 +42,270 @@ class Task(models.Model):
     approved_at = models.DateTimeField(null=True, blank=True)
     rejected_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination over ('queue_order', '-created_at', '-id');
+            # the id tie-breaker is part of the key so pages need no sort.
+            models.Index(fields=['assigned_to', 'queue_order', '-created_at', '-id'],
+                         name='task_assignee_queue_idx'),
+            models.Index(fields=['queue_order', '-created_at', '-id'],
+                         name='task_queue_idx'),
+            # Server-side filters (?status=, ?assigned_to=, date ranges)
+            models.Index(fields=['status', 'queue_order', '-created_at'],
+                         name='task_status_queue_idx'),
+            models.Index(fields=['assigned_to', 'status'],
+                         name='task_assignee_status_idx'),
+            models.Index(fields=['created_at'], name='task_created_idx'),
+            models.Index(fields=['updated_at'], name='task_updated_idx'),
+        ]
+
+    QUEUE_GAP = 1024
+    # Below this many free keys between neighbours a rebalance is scheduled
+    QUEUE_MIN_GAP = 8
+
+    # Statuses a task may be created in; later ones come from TRANSITIONS
+    INITIAL_STATUSES = ('PENDING', 'TODO')
+
+    # Workflow graph: target status -> (allowed current statuses, timestamp)
+    TRANSITIONS = {
+        'TODO': (('PENDING',), 'todo_at'),
+        'DONE': (('TODO',), 'done_at'),
+        'APPROVED': (('DONE',), 'approved_at'),
+        'REJECTED': (('DONE',), 'rejected_at'),
+    }
+
     def __str__(self):
         return f"{self.title} - {self.assigned_to}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_counted()
+        return instance
+
+    def _remember_counted(self):
+        # (programmer, status) this row is counted under in ProgrammerStats
+        loaded = self.__dict__
+        if 'assigned_to_id' in loaded and 'status' in loaded:
+            self._counted = (self.assigned_to_id, self.status)
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        # The row and its counters change together or not at all
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
+            previous = None if adding else getattr(self, '_counted', False)
+            if previous is False:
+                return  # loaded without status/assignee: nothing to compare
+            current = (self.assigned_to_id, self.status)
+            if previous != current:
+                ProgrammerStats.apply_moves([(previous, current)])
+                if previous and previous[0] not in (None, current[0]):
+                    # Gone from the old assignee's list: their delta sync drops it
+                    TaskTombstone.objects.create(
+                        task_id=self.pk, assigned_to_id=previous[0])
+        self._counted = current
+
+    def transition_to(self, target, **fields):
+        """
+        Move the task to ``target`` with one conditional UPDATE.
+
+        The row is only written if its current status allows the transition,
+        so concurrent requests cannot both succeed; the counters in
+        ProgrammerStats move in the same transaction. Returns ``False`` when
+        the precondition failed; on success the instance is updated in place.
+        """
+        sources, timestamp_field = self.TRANSITIONS[target]
+        now = timezone.now()
+        values = {'status': target, timestamp_field: now,
+                  'updated_at': now, **fields}
+        with transaction.atomic():
+            updated = Task.objects.filter(
+                pk=self.pk, status__in=sources).update(**values)
+            if not updated:
+                return False
+            # Each target has a single source status, so the move is known.
+            ProgrammerStats.apply_moves(
+                [((self.assigned_to_id, sources[0]), (self.assigned_to_id, target))])
+        for attr, value in values.items():
+            setattr(self, attr, value)
+        self._counted = (self.assigned_to_id, target)
+        publish_task_event(self, 'updated')
+        return True
+
+    @classmethod
+    def bulk_transition(cls, ids, target, **fields):
+        """
+        Set-based ``transition_to`` for many tasks: one conditional UPDATE
+        plus one SELECT of the rows it changed. Returns those tasks.
+        """
+        sources, timestamp_field = cls.TRANSITIONS[target]
+        now = timezone.now()
+        values = {'status': target, timestamp_field: now,
+                  'updated_at': now, **fields}
+        with transaction.atomic():
+            cls.objects.filter(pk__in=ids, status__in=sources).update(**values)
+            # The write lock is held, so rows at ``target`` stamped with
+            # ``now`` are exactly the ones updated above.
+            tasks = list(cls.objects.filter(
+                pk__in=ids, status=target, **{timestamp_field: now}))
+            ProgrammerStats.apply_moves([
+                ((task.assigned_to_id, sources[0]), (task.assigned_to_id, target))
+                for task in tasks])
+        for task in tasks:
+            publish_task_event(task, 'updated')
+        return tasks
+
+    def requeue(self, reason):
+        """
+        Create the redo copy of a rejected task at the end of its programmer's
+        active queue. Must run inside ``transaction.atomic()``.
+        """
+        return Task.bulk_requeue([self], reason)[0]
+
+    @classmethod
+    def bulk_requeue(cls, tasks, reason):
+        """``requeue`` for many rejected tasks with one aggregate and one insert."""
+        programmer_ids = {task.assigned_to_id for task in tasks}
+        cls.lock_queues(programmer_ids)
+        last_orders = cls.queue_ends(programmer_ids)
+
+        now = timezone.now()
+        copies = []
+        for task in tasks:
+            programmer_id = task.assigned_to_id
+            last_orders[programmer_id] = (
+                (last_orders.get(programmer_id) or 0) + cls.QUEUE_GAP)
+            copies.append(cls(
+                title=task.title,
+                description=task.description,
+                assigned_to_id=programmer_id,
+                status='TODO',
+                todo_at=now,
+                queue_order=last_orders[programmer_id],
+                rejection_reason=f"Qayta bajarish (sabab: {reason})"
+            ))
+        cls.objects.bulk_create(copies)
+        ProgrammerStats.apply_moves(
+            [(None, (copy.assigned_to_id, copy.status)) for copy in copies])
+        cls._share_attachments(tasks, copies)
+        for copy in copies:
+            publish_task_event(copy, 'created')
+        return copies
+
+    @classmethod
+    def _share_attachments(cls, tasks, copies):
+        """Point the copies at their originals' files instead of re-uploading."""
+        from . import blobs
+
+        copy_of = {task.pk: copy for task, copy in zip(tasks, copies)}
+        shared = []
+        for attachment in TaskAttachment.objects.filter(task__in=tasks):
+            attachment.pk = None
+            attachment.task = copy_of[attachment.task_id]
+            shared.append(attachment)
+        TaskAttachment.objects.bulk_create(shared)
+        blobs.share(a.blob_id for a in shared if a.blob_id)
+        blobs.share(a.thumbnail_blob_id for a in shared if a.thumbnail_blob_id)
+
+    @classmethod
+    def queue_ends(cls, programmer_ids):
+        """
+        ``{programmer_id: highest queue_order}`` over all of the
+        programmer's tasks, finished ones included: keys are unique per
+        programmer, as ``move`` and ``rebalance_queue`` assume. Call it
+        after ``lock_queues`` when appending.
+        """
+        return dict(
+            cls.objects.filter(assigned_to_id__in=programmer_ids)
+            .values('assigned_to_id')
+            .annotate(last=models.Max('queue_order'))
+            .values_list('assigned_to_id', 'last'))
+
+    @staticmethod
+    def lock_queues(programmer_ids):
+        """
+        Lock the programmers' rows so concurrent writes to their queues run
+        one at a time (SQLite already serializes writers within the
+        transaction); rows are locked in pk order so two callers cannot
+        deadlock. Returns the ids that exist. Must run inside
+        ``transaction.atomic()``.
+        """
+        return list(Programmer.objects.select_for_update().filter(
+            pk__in=programmer_ids).order_by('pk').values_list('pk', flat=True))
+
+    def _queue_siblings(self):
+        return Task.objects.filter(
+            assigned_to_id=self.assigned_to_id).exclude(pk=self.pk)
+
+    def _follows(self, other):
+        """Rows after ``other`` in ('queue_order', '-created_at', '-id')."""
+        key, created, pk = other.queue_order, other.created_at, other.pk
+        return (models.Q(queue_order__gt=key)
+                | models.Q(queue_order=key, created_at__lt=created)
+                | models.Q(queue_order=key, created_at=created, pk__lt=pk))
+
+    def move(self, sibling, after=False):
+        """
+        Place the task just before (or after) ``sibling`` in the queue.
+
+        Only this row is updated: the new key is the midpoint between the
+        neighbouring keys. When the neighbours are adjacent the queue is
+        rebalanced first; when the gap gets narrow a background rebalance is
+        scheduled. Must run inside ``transaction.atomic()``.
+        """
+        Task.lock_queues([self.assigned_to_id])
+        sibling.refresh_from_db(fields=['queue_order', 'created_at'])
+        siblings = self._queue_siblings().order_by(
+            'queue_order', '-created_at', '-id')
+        if after:
+            lower = sibling
+            upper = siblings.filter(self._follows(sibling)).first()
+        else:
+            upper = sibling
+            lower = siblings.exclude(self._follows(sibling)).exclude(
+                pk=sibling.pk).last()
+
+        low = lower.queue_order if lower else 0
+        if upper is None:
+            key = low + self.QUEUE_GAP
+        elif upper.queue_order - low >= 2:
+            key = (low + upper.queue_order) // 2
+        else:
+            Task.rebalance_queue(self.assigned_to_id)
+            return self.move(sibling, after=after)
+
+        now = timezone.now()
+        Task.objects.filter(pk=self.pk).update(queue_order=key, updated_at=now)
+        self.queue_order, self.updated_at = key, now
+        publish_task_event(self, 'updated')
+
+        if upper is not None and upper.queue_order - low < self.QUEUE_MIN_GAP:
+            from . import jobs
+            jobs.enqueue(rebalance_programmer_queue, priority=-1,
+                         programmer_id=self.assigned_to_id)
+        return key
+
+    @classmethod
+    def rebalance_queue(cls, programmer_id):
+        """Respace a programmer's queue keys QUEUE_GAP apart, keeping order."""
+        with transaction.atomic():
+            cls.lock_queues([programmer_id])
+            tasks = list(cls.objects.filter(assigned_to_id=programmer_id)
+                         .order_by('queue_order', '-created_at', '-id')
+                         .only('id', 'queue_order', 'updated_at'))
+            now = timezone.now()
+            for position, task in enumerate(tasks, start=1):
+                task.queue_order = position * cls.QUEUE_GAP
+                task.updated_at = now
+            cls.objects.bulk_update(
+                tasks, ['queue_order', 'updated_at'], batch_size=500)
+
+
+def rebalance_programmer_queue(programmer_id):
+    """Background job entry point for Task.rebalance_queue."""
+    Task.rebalance_queue(programmer_id)
+
 
 class Programmer(models.Model):
     phone_number = models.CharField(max_length=20, null=True, blank=True)
@@ -44,8 +314,13 @@ class Programmer(models.Model):
         max_length=100, null=True, blank=True)  # e.g., "3 yil"
     education = models.CharField(max_length=255, null=True, blank=True)
     bio = models.TextField(null=True, blank=True)
+    # Bumped on every profile or linked user change; used as a cache validator
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
+        if self.pk and not Programmer.user.is_cached(self):
+            from .directory import programmer_name
+            return programmer_name(self.pk)
         # We'll use the reverse relation to get the name if available
         try:
             return f"{self.user.first_name} {self.user.last_name}"
@@ -53,6 +328,72 @@ class Programmer(models.Model):
             return f"Programmer {self.id}"
 
 
+class ProgrammerStats(models.Model):
+    """
+    Task counts per status for one programmer, kept up to date on every
+    create, transition, reassignment and delete with F() updates, so the
+    stats endpoint never scans Task. ``manage.py recount_stats`` rebuilds
+    them from scratch.
+    """
+    programmer = models.OneToOneField(
+        Programmer, on_delete=models.CASCADE, primary_key=True,
+        related_name='stats')
+    pending = models.IntegerField(default=0)
+    todo = models.IntegerField(default=0)
+    done = models.IntegerField(default=0)
+    approved = models.IntegerField(default=0)
+    rejected = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Stats for {self.programmer}"
+
+    @classmethod
+    def apply_moves(cls, moves):
+        """
+        Apply ``(old, new)`` moves of ``(programmer_id, status)`` pairs;
+        ``None`` on either side means created / deleted. Issues one UPDATE
+        per affected programmer.
+        """
+        deltas = {}
+        for old, new in moves:
+            for key, step in ((old, -1), (new, 1)):
+                if key is None or key[0] is None:
+                    continue
+                programmer_id, status = key
+                counts = deltas.setdefault(programmer_id, {})
+                column = status.lower()
+                counts[column] = counts.get(column, 0) + step
+
+        for programmer_id, counts in deltas.items():
+            changes = {column: models.F(column) + delta
+                       for column, delta in counts.items() if delta}
+            if not changes:
+                continue
+            changes['updated_at'] = timezone.now()
+            if cls.objects.filter(programmer_id=programmer_id).update(**changes):
+                continue
+            # Decrements without a row come from the programmer being
+            # deleted (its stats row cascades first): nothing to keep.
+            if any(delta > 0 for delta in counts.values()):
+                cls.objects.get_or_create(programmer_id=programmer_id)
+                cls.objects.filter(programmer_id=programmer_id).update(**changes)
+
+    @classmethod
+    def recount(cls):
+        """Rebuild every row from Task with one grouped query."""
+        rows = {pk: cls(programmer_id=pk)
+                for pk in Programmer.objects.values_list('pk', flat=True)}
+        grouped = (Task.objects.values('assigned_to_id', 'status')
+                   .annotate(count=models.Count('id')).order_by())
+        for row in grouped:
+            setattr(rows[row['assigned_to_id']], row['status'].lower(),
+                    row['count'])
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(rows.values(), batch_size=500)
+
+
 class User(AbstractUser):
     programmer = models.OneToOneField(
         Programmer, on_delete=models.SET_NULL, null=True, blank=True, related_name='user')
@@ -67,17 +408,250 @@ class User(AbstractUser):
         return full_name or self.username
 
 
+class AttachmentBlob(models.Model):
+    """
+    One stored file, shared by every TaskAttachment with the same content.
+
+    ``ref_count`` is the number of attachments using it, as their file or
+    their thumbnail; the blob and its file are removed when the last one
+    is deleted (see tasks.blobs).
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to='tasks/blobs/')
+    size = models.PositiveBigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.ref_count})"
+
+
 class TaskAttachment(models.Model):
     FILE_TYPES = [
         ('IMAGE', 'Rasm'),
         ('VIDEO', 'Video'),
         ('AUDIO', 'Audio'),
     ]
+    PROCESSING_STATUSES = [
+        ('PENDING', 'Kutilmoqda'),
+        ('DONE', 'Tayyor'),
+        ('FAILED', 'Xato'),
+    ]
     task = models.ForeignKey(
         Task, on_delete=models.CASCADE, related_name='attachments')
     file = models.FileField(upload_to='tasks/attachments/')
+    # Content-addressed storage; ``file`` then points at ``blob.file``.
+    # Attachments created before deduplication have no blob.
+    blob = models.ForeignKey(
+        'AttachmentBlob', on_delete=models.PROTECT, null=True, blank=True,
+        related_name='attachments')
     file_type = models.CharField(max_length=10, choices=FILE_TYPES)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Filled in by tasks.media in the background
+    thumbnail = models.FileField(
+        upload_to='tasks/thumbnails/', null=True, blank=True)
+    # Thumbnails are blobs too, so rework copies can share them
+    thumbnail_blob = models.ForeignKey(
+        'AttachmentBlob', on_delete=models.PROTECT, null=True, blank=True,
+        related_name='thumbnail_attachments')
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    duration = models.FloatField(null=True, blank=True)  # seconds
+    size = models.PositiveBigIntegerField(null=True, blank=True)  # bytes
+    processing_status = models.CharField(
+        max_length=10, choices=PROCESSING_STATUSES, default='PENDING')
+    processed_at = models.DateTimeField(null=True, blank=True)
+
     def __str__(self):
         return f"{self.file_type} for {self.task.title}"
+
+
+class TaskTombstone(models.Model):
+    """
+    Records a task that left ``assigned_to_id``'s list (deleted, or
+    reassigned to someone else) so delta-sync clients can drop it.
+    """
+    task_id = models.BigIntegerField()
+    assigned_to_id = models.BigIntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_idx'),
+            models.Index(fields=['assigned_to_id', 'deleted_at'],
+                         name='tombstone_assignee_idx'),
+        ]
+
+    def __str__(self):
+        return f"Task {self.task_id} deleted at {self.deleted_at}"
+
+    @classmethod
+    def prune(cls, older_than=None):
+        """
+        Delete tombstones older than ``older_than`` (default
+        ``TASK_TOMBSTONE_RETENTION_DAYS``); returns how many were deleted.
+        """
+        if older_than is None:
+            older_than = timedelta(
+                days=getattr(settings, 'TASK_TOMBSTONE_RETENTION_DAYS', 30))
+        cutoff = timezone.now() - older_than
+        return cls.objects.filter(deleted_at__lt=cutoff).delete()[0]
+
+
+class AttachmentUpload(models.Model):
+    """
+    A resumable, chunked upload of one TaskAttachment.
+
+    Chunks are written at their offset into a part file under
+    ``TASK_UPLOAD_TEMP_DIR``; ``offset`` is the number of bytes received so
+    far and is what a client resumes from.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    task = models.ForeignKey(
+        Task, on_delete=models.CASCADE, related_name='uploads')
+    file_type = models.CharField(
+        max_length=10, choices=TaskAttachment.FILE_TYPES)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    created_by = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='uploads')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+    @property
+    def part_path(self):
+        return os.path.join(settings.TASK_UPLOAD_TEMP_DIR, f"{self.pk}.part")
+
+    @property
+    def is_complete(self):
+        return self.offset == self.size
+
+    def write_chunk(self, stream, offset, length, block_size=64 * 1024):
+        """
+        Write ``length`` bytes from ``stream`` to the part file at ``offset``.
+        Returns ``False`` if another request moved the offset first.
+
+        The body is first spooled, in fixed-size blocks, to a scratch file
+        next to the part file, without holding any lock. The offset is then
+        claimed with a conditional UPDATE and the scratch file copied into
+        the part file in the same transaction, so a request that loses the
+        race never touches the part file.
+        """
+        import shutil
+        import tempfile
+
+        os.makedirs(settings.TASK_UPLOAD_TEMP_DIR, exist_ok=True)
+        with tempfile.TemporaryFile(dir=settings.TASK_UPLOAD_TEMP_DIR) as chunk:
+            received = 0
+            while received < length:
+                block = stream.read(min(block_size, length - received))
+                if not block:
+                    break
+                chunk.write(block)
+                received += len(block)
+
+            new_offset = offset + received
+            with transaction.atomic():
+                updated = AttachmentUpload.objects.filter(
+                    pk=self.pk, offset=offset).update(
+                        offset=new_offset, updated_at=timezone.now())
+                if not updated:
+                    return False
+                mode = 'r+b' if os.path.exists(self.part_path) else 'wb'
+                chunk.seek(0)
+                with open(self.part_path, mode) as part:
+                    part.seek(offset)
+                    shutil.copyfileobj(chunk, part, block_size)
+        self.offset = new_offset
+        return True
+
+    @classmethod
+    def purge_stale(cls, older_than=None):
+        """
+        Delete uploads not resumed for ``older_than`` (default
+        ``TASK_UPLOAD_EXPIRY_HOURS``) and part files left without an upload;
+        returns how many uploads were deleted. Their part files go with
+        them (tasks.signals).
+        """
+        if older_than is None:
+            older_than = timedelta(
+                hours=getattr(settings, 'TASK_UPLOAD_EXPIRY_HOURS', 24))
+        cutoff = timezone.now() - older_than
+        deleted = cls.objects.filter(updated_at__lt=cutoff).delete()[1].get(
+            cls._meta.label, 0)
+
+        directory = settings.TASK_UPLOAD_TEMP_DIR
+        if os.path.isdir(directory):
+            known = {f"{pk}.part" for pk in cls.objects.values_list('pk', flat=True)}
+            for name in os.listdir(directory):
+                path = os.path.join(directory, name)
+                if (name.endswith('.part') and name not in known
+                        and os.path.getmtime(path) < cutoff.timestamp()):
+                    os.remove(path)
+        return deleted
+
+    def assemble(self):
+        """Store the finished part file as a TaskAttachment of the task."""
+        from django.core.files import File
+        from . import blobs
+        from .media import schedule_processing
+
+        part_path = self.part_path
+        with transaction.atomic():
+            with open(part_path, 'rb') as part:
+                blob = blobs.store(File(part), self.filename)
+            attachment = TaskAttachment.objects.create(
+                task=self.task, file_type=self.file_type, blob=blob,
+                file=blob.file.name, size=blob.size)
+            Task.objects.filter(pk=self.task_id).update(
+                updated_at=timezone.now())
+            # The part file is removed on commit (tasks.signals)
+            self.delete()
+            schedule_processing([attachment])
+        self.task.refresh_from_db()
+        publish_task_event(self.task, 'updated')
+        return attachment
+
+
+class Job(models.Model):
+    """
+    A deferred call run by ``manage.py run_jobs`` (see tasks.jobs).
+
+    A claimed job is invisible to other workers until ``locked_until``; if
+    its worker dies, the job becomes claimable again after that.
+    """
+    STATUS_CHOICES = [
+        ('QUEUED', 'Navbatda'),
+        ('RUNNING', 'Bajarilmoqda'),
+        ('DONE', 'Bajarildi'),
+        ('FAILED', 'Xato'),
+    ]
+    func = models.CharField(max_length=255)  # dotted path of the callable
+    kwargs = models.JSONField(default=dict, blank=True)
+    priority = models.IntegerField(default=0)  # higher runs first
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default='QUEUED')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', '-priority', 'run_at'],
+                         name='job_claim_idx'),
+            models.Index(fields=['status', 'locked_until'],
+                         name='job_expired_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.func} [{self.status}]"
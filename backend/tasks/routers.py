@@ -0,0 +1,106 @@
+"""
+Primary/replica database routing.
+
+Aliases listed in ``settings.DATABASE_REPLICAS`` serve reads of safe
+(GET/HEAD/OPTIONS) requests, picked at random per query. Everything else
+stays on ``default``: unsafe requests, management commands and jobs (which
+run outside a request), any request that has written to the database, and
+every request of a user for ``DATABASE_REPLICA_PIN_SECONDS`` after one of
+their writes, so nobody reads data older than their own last change.
+
+The SPA authenticates with an Authorization header and sends no cookies, so
+recent writers are remembered by user id in the ``DATABASE_REPLICA_PIN_CACHE``
+cache alias (use a shared backend when running several processes) and
+checked once the request is authenticated (tasks.authentication).
+"""
+import contextlib
+import contextvars
+import random
+
+from django.conf import settings
+from django.core.cache import caches
+
+PIN_KEY = 'tasks:db-primary-pin:{}'
+
+# Set by the middleware for safe requests; cleared on the first write.
+_use_replicas = contextvars.ContextVar('use_replicas', default=False)
+
+
+def get_replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', ()))
+
+
+def use_replicas(enabled):
+    """Allow reads from replicas in the current context; returns a reset token."""
+    return _use_replicas.set(enabled)
+
+
+def reset_replicas(token):
+    _use_replicas.reset(token)
+
+
+def pin_to_primary():
+    _use_replicas.set(False)
+
+
+@contextlib.contextmanager
+def primary_reads():
+    """
+    Read from ``default`` inside the block, for reads whose result is cached
+    and served to everybody: a lagging replica would be cached for the
+    whole timeout.
+    """
+    token = _use_replicas.set(False)
+    try:
+        yield
+    finally:
+        _use_replicas.reset(token)
+
+
+def _pin_cache():
+    return caches[getattr(settings, 'DATABASE_REPLICA_PIN_CACHE', 'default')]
+
+
+def remember_write(user_id):
+    """Keep ``user_id`` on the primary until replicas have caught up."""
+    _pin_cache().set(PIN_KEY.format(user_id), True,
+                     getattr(settings, 'DATABASE_REPLICA_PIN_SECONDS', 5))
+
+
+def pin_recent_writer(user_id):
+    """Called after authentication: pin the request if the user just wrote."""
+    if _use_replicas.get() and _pin_cache().get(PIN_KEY.format(user_id)):
+        pin_to_primary()
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = get_replicas()
+        if replicas and _use_replicas.get():
+            return random.choice(replicas)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        # Objects loaded from another, non-replica alias (e.g. the scratch
+        # databases of benchmark_sqlite) are written back to it.
+        instance = hints.get('instance')
+        db = getattr(getattr(instance, '_state', None), 'db', None)
+        if db and db != 'default' and db not in get_replicas():
+            return db
+        # Read-after-write within the request goes to the primary
+        pin_to_primary()
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {'default', *get_replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        if obj1._state.db == obj2._state.db:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema and data from the primary
+        if db in get_replicas():
+            return False
+        return None
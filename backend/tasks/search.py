@@ -0,0 +1,210 @@
+"""
+Full-text search over task titles and descriptions.
+
+Backends share one interface: ``install``/``uninstall`` create and drop the
+index (called from migrations), ``ranked_ids`` returns the best matching
+task ids in rank order and ``filter`` narrows a queryset without ranking.
+
+``SQLiteFTSBackend`` keeps an external-content FTS5 table in sync with
+triggers, so every write path (save, bulk_create, queryset.update, delete)
+updates the index. ``PostgresSearchBackend`` uses a GIN expression index
+over ``to_tsvector``. ``TASK_SEARCH_BACKEND`` selects a backend explicitly;
+by default it follows the database vendor, with a slow ``icontains``
+fallback for anything else.
+"""
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+WORD_RE = re.compile(r'\w+')
+
+
+def _words(query):
+    return WORD_RE.findall(query or '')
+
+
+def _ids_sql(queryset):
+    return queryset.order_by().values('pk').query.get_compiler(
+        using=queryset.db).as_sql()
+
+
+class SQLiteFTSBackend:
+    table = 'tasks_task_fts'
+    # bm25 column weights: a hit in the title counts ten times as much
+    weights = (10.0, 1.0)
+    triggers = {
+        'tasks_task_fts_insert': """
+            AFTER INSERT ON tasks_task BEGIN
+                INSERT INTO tasks_task_fts(rowid, title, description)
+                VALUES (new.id, new.title, new.description);
+            END""",
+        'tasks_task_fts_delete': """
+            AFTER DELETE ON tasks_task BEGIN
+                INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+            END""",
+        'tasks_task_fts_update': """
+            AFTER UPDATE OF title, description ON tasks_task
+            WHEN old.title IS NOT new.title OR old.description IS NOT new.description
+            BEGIN
+                INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title, description)
+                VALUES ('delete', old.id, old.title, old.description);
+                INSERT INTO tasks_task_fts(rowid, title, description)
+                VALUES (new.id, new.title, new.description);
+            END""",
+    }
+
+    def install(self, schema_editor, model):
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+            f"title, description, content='tasks_task', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2')")
+        schema_editor.execute(
+            f"INSERT INTO {self.table}({self.table}) VALUES ('rebuild')")
+        self.ensure_triggers(schema_editor.connection)
+
+    def uninstall(self, schema_editor, model):
+        for name in self.triggers:
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {name}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {self.table}')
+
+    def ensure_triggers(self, connection):
+        """
+        (Re)create the sync triggers. SQLite drops triggers when Django
+        rebuilds tasks_task during a later ALTER, so this also runs after
+        every migrate; the FTS content itself survives the rebuild.
+        """
+        with connection.cursor() as cursor:
+            if self.table not in connection.introspection.table_names(cursor):
+                return
+            for name, body in self.triggers.items():
+                cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {body}')
+
+    def match_expression(self, query):
+        # Quote every word so FTS5 syntax in user input is inert; prefix
+        # match the words so results show up while typing.
+        return ' '.join('"%s"*' % word for word in _words(query))
+
+    def ranked_ids(self, queryset, query, limit):
+        match = self.match_expression(query)
+        if not match:
+            return []
+        ids_sql, params = _ids_sql(queryset)
+        weights = ', '.join(str(w) for w in self.weights)
+        sql = (f'SELECT rowid FROM {self.table} '
+               f'WHERE {self.table} MATCH %s AND rowid IN ({ids_sql}) '
+               f'ORDER BY bm25({self.table}, {weights}) LIMIT %s')
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(sql, (match, *params, limit))
+            return [row[0] for row in cursor.fetchall()]
+
+    def filter(self, queryset, query):
+        match = self.match_expression(query)
+        if not match:
+            return queryset.none()
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s',
+            (match,)))
+
+
+class PostgresSearchBackend:
+    config = 'simple'
+    index_name = 'task_search_idx'
+
+    def vector(self, weighted=False):
+        from django.contrib.postgres.search import SearchVector
+
+        if weighted:
+            return (SearchVector('title', config=self.config, weight='A')
+                    + SearchVector('description', config=self.config, weight='B'))
+        # Must stay identical to the indexed expression
+        return SearchVector('title', 'description', config=self.config)
+
+    def search_query(self, query):
+        from django.contrib.postgres.search import SearchQuery
+
+        return SearchQuery(query, config=self.config, search_type='websearch')
+
+    def install(self, schema_editor, model):
+        from django.contrib.postgres.indexes import GinIndex
+
+        schema_editor.add_index(
+            model, GinIndex(self.vector(), name=self.index_name))
+
+    def uninstall(self, schema_editor, model):
+        schema_editor.execute(f'DROP INDEX IF EXISTS {self.index_name}')
+
+    def ensure_triggers(self, connection):
+        pass
+
+    def ranked_ids(self, queryset, query, limit):
+        from django.contrib.postgres.search import SearchRank
+
+        search_query = self.search_query(query)
+        return list(
+            self.filter(queryset, query)
+            .annotate(search_rank=SearchRank(self.vector(weighted=True),
+                                             search_query))
+            .order_by('-search_rank', '-created_at')
+            .values_list('pk', flat=True)[:limit])
+
+    def filter(self, queryset, query):
+        if not _words(query):
+            return queryset.none()
+        return queryset.annotate(search=self.vector()).filter(
+            search=self.search_query(query))
+
+
+class ContainsSearchBackend:
+    """Unindexed fallback: every word must occur in title or description."""
+
+    def install(self, schema_editor, model):
+        pass
+
+    def uninstall(self, schema_editor, model):
+        pass
+
+    def ensure_triggers(self, connection):
+        pass
+
+    def ranked_ids(self, queryset, query, limit):
+        title_hit = Q()
+        for word in _words(query):
+            title_hit &= Q(title__icontains=word)
+        return list(
+            self.filter(queryset, query)
+            .annotate(search_rank=Case(
+                When(title_hit, then=Value(1)), default=Value(0),
+                output_field=IntegerField()))
+            .order_by('-search_rank', '-created_at')
+            .values_list('pk', flat=True)[:limit])
+
+    def filter(self, queryset, query):
+        words = _words(query)
+        if not words:
+            return queryset.none()
+        for word in words:
+            queryset = queryset.filter(
+                Q(title__icontains=word) | Q(description__icontains=word))
+        return queryset
+
+
+VENDOR_BACKENDS = {
+    'sqlite': 'tasks.search.SQLiteFTSBackend',
+    'postgresql': 'tasks.search.PostgresSearchBackend',
+}
+_backends = {}
+
+
+def get_search_backend(using='default'):
+    backend = _backends.get(using)
+    if backend is None:
+        path = (getattr(settings, 'TASK_SEARCH_BACKEND', None)
+                or VENDOR_BACKENDS.get(connections[using].vendor,
+                                       'tasks.search.ContainsSearchBackend'))
+        backend = _backends[using] = import_string(path)()
+    return backend
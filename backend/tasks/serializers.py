@@ -1,5 +1,9 @@
 from rest_framework import serializers
-from .models import Task, Programmer, TaskAttachment, User
+from django.conf import settings
+from django.core.cache import caches
+from django.db import models
+from .models import Task, Programmer, TaskAttachment, User, AttachmentUpload
+from .directory import programmer_full_name, programmer_name, programmer_names
 
 
 class ProgrammerSerializer(serializers.ModelSerializer):
@@ -11,6 +15,8 @@ class ProgrammerSerializer(serializers.ModelSerializer):
                   'address', 'experience', 'education', 'bio')
 
     def get_full_name(self, obj):
+        if not Programmer.user.is_cached(obj):
+            return programmer_full_name(obj.id)
         try:
             return obj.user.get_full_name()
         except:
@@ -127,16 +133,71 @@ class UserSerializer(serializers.ModelSerializer):
 
 class TaskAttachmentSerializer(serializers.ModelSerializer):
     file = serializers.SerializerMethodField()
+    thumbnail = serializers.SerializerMethodField()
 
     class Meta:
         model = TaskAttachment
-        fields = ('id', 'file', 'file_type', 'created_at')
+        fields = ('id', 'file', 'file_type', 'created_at', 'thumbnail',
+                  'width', 'height', 'duration', 'size', 'processing_status')
+
+    def _file_url(self, obj, field_file, variant=None):
+        """
+        The permission-checked ``attachments/{id}/file/`` endpoint, never
+        the public MEDIA_URL path of the stored file.
+        """
+        if not field_file:
+            return None
+        from rest_framework.reverse import reverse
+
+        url = reverse('taskattachment-file', kwargs={'pk': obj.pk},
+                      request=self.context.get('request'))
+        return f'{url}?variant={variant}' if variant else url
 
     def get_file(self, obj):
-        request = self.context.get('request')
-        if obj.file and request:
-            return request.build_absolute_uri(obj.file.url)
-        return obj.file.url if obj.file else None
+        return self._file_url(obj, obj.file)
+
+    def get_thumbnail(self, obj):
+        return self._file_url(obj, obj.thumbnail, variant='thumbnail')
+
+
+class FragmentCachedListSerializer(serializers.ListSerializer):
+    """
+    Renders each row from the fragment cache when possible.
+
+    The child builds a key per object with ``get_fragment_key`` (``None``
+    disables caching for that row); rows missing from the cache are
+    serialized and stored, all in one ``get_many``/``set_many`` round trip.
+    Before rendering, the child's ``prepare_rows`` (if any) gets the rows
+    to render, to load per-row data for all of them at once.
+    """
+
+    def to_representation(self, data):
+        if isinstance(data, models.manager.BaseManager):
+            data = data.all()
+        items = list(data)
+        prepare = getattr(self.child, 'prepare_rows', None)
+        if not getattr(self.child, 'fragment_cache', False):
+            if prepare:
+                prepare(items)
+            return super().to_representation(items)
+
+        keys = [self.child.get_fragment_key(item) for item in items]
+        cache = caches[getattr(settings, 'TASK_FRAGMENT_CACHE', 'default')]
+        cached = cache.get_many([key for key in keys if key])
+        if prepare:
+            prepare([item for item, key in zip(items, keys)
+                     if not key or key not in cached])
+        rendered, fresh = [], {}
+        for item, key in zip(items, keys):
+            fragment = cached.get(key) if key else None
+            if fragment is None:
+                fragment = self.child.to_representation(item)
+                if key:
+                    fresh[key] = fragment
+            rendered.append(fragment)
+        if fresh:
+            cache.set_many(fresh)
+        return rendered
 
 
 class TaskSerializer(serializers.ModelSerializer):
@@ -144,9 +205,42 @@ class TaskSerializer(serializers.ModelSerializer):
     attachments = serializers.SerializerMethodField()
     duration_info = serializers.SerializerMethodField()
 
+    # Bump when the rendered representation changes shape
+    fragment_version = 2
+    fragment_cache = True
+
     class Meta:
         model = Task
         fields = '__all__'
+        # Stamped by the workflow actions (Task.transition_to)
+        read_only_fields = ('pending_at', 'todo_at', 'done_at',
+                            'approved_at', 'rejected_at')
+        list_serializer_class = FragmentCachedListSerializer
+
+    def get_fragment_key(self, obj):
+        """
+        Everything the rendered dict depends on: the row (updated_at, also
+        bumped by attachment changes), the assignee's name (Programmer
+        updated_at) and the host used for absolute attachment URLs.
+        """
+        if obj.assigned_to_id and not Task.assigned_to.is_cached(obj):
+            return None
+        names = obj.assigned_to.updated_at.timestamp() if obj.assigned_to_id else ''
+        request = self.context.get('request')
+        base_url = request.build_absolute_uri('/') if request else ''
+        return (f'tasks:fragment:{self.fragment_version}:{obj.pk}:'
+                f'{obj.updated_at.timestamp()}:{names}:{base_url}')
+
+    def validate_status(self, value):
+        # Status only moves along the workflow graph, through the actions
+        if self.instance is None:
+            if value not in Task.INITIAL_STATUSES:
+                raise serializers.ValidationError(
+                    "Yangi task faqat PENDING yoki TODO holatida yaratiladi")
+        elif value != self.instance.status:
+            raise serializers.ValidationError(
+                "Holat faqat start/complete/approve/reject amallari orqali o'zgaradi")
+        return value
 
     def get_attachments(self, obj):
         request = self.context.get('request')
@@ -155,7 +249,20 @@ class TaskSerializer(serializers.ModelSerializer):
         )
         return serializer.data
 
+    def prepare_rows(self, tasks):
+        """Look up the names of assignees that are not loaded in one batch."""
+        if 'assigned_to_name' not in self.fields:
+            return
+        self._assignee_names = programmer_names(
+            task.assigned_to_id for task in tasks
+            if task.assigned_to_id and not Task.assigned_to.is_cached(task))
+
     def get_assigned_to_name(self, obj):
+        if obj.assigned_to_id and not Task.assigned_to.is_cached(obj):
+            names = getattr(self, '_assignee_names', {})
+            if obj.assigned_to_id in names:
+                return names[obj.assigned_to_id]
+            return programmer_name(obj.assigned_to_id)
         return str(obj.assigned_to)
 
     def get_duration_info(self, obj):
@@ -200,3 +307,93 @@ class TaskSerializer(serializers.ModelSerializer):
             parts.append(f"{minutes} d")
 
         return " ".join(parts) if parts else "1 d.dan kam"
+
+
+class TaskListSerializer(TaskSerializer):
+    """
+    Compact task representation for list views.
+
+    Only ``default_fields`` are rendered unless the client asks for more:
+    ``?fields=id,title,status`` picks an exact subset and
+    ``?expand=attachments,duration_info`` adds heavy fields to the default.
+    Unrequested fields are removed before serialization, so their per-row
+    work (attachment URLs, duration formatting) never runs.
+    """
+    default_fields = ('id', 'title', 'status', 'assigned_to',
+                      'assigned_to_name', 'queue_order',
+                      'created_at', 'updated_at')
+
+    # Model columns each computed field reads; used to build .only()
+    field_sources = {
+        'assigned_to_name': ('assigned_to',),
+        'duration_info': ('pending_at', 'todo_at', 'done_at', 'approved_at'),
+        'attachments': (),
+    }
+
+    # Renders a per-request subset of fields
+    fragment_cache = False
+
+    class Meta(TaskSerializer.Meta):
+        pass
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        params = request.query_params if request else {}
+        selected = self.get_selected_fields(params)
+        unknown = [name for name in selected if name not in self.fields]
+        if unknown:
+            raise serializers.ValidationError(
+                {'fields': [f"Noma'lum maydon: {name}" for name in unknown]})
+        for name in set(self.fields) - set(selected):
+            self.fields.pop(name)
+
+    @classmethod
+    def is_requested(cls, params):
+        return 'fields' in params or 'expand' in params
+
+    @classmethod
+    def get_selected_fields(cls, params):
+        def split(value):
+            return [f.strip() for f in (value or '').split(',') if f.strip()]
+
+        fields = split(params.get('fields')) or list(cls.default_fields)
+        fields += [f for f in split(params.get('expand')) if f not in fields]
+        return fields
+
+    @classmethod
+    def get_only_columns(cls, fields):
+        """Model columns needed to render ``fields``."""
+        concrete = {f.name for f in Task._meta.concrete_fields}
+        columns = {'id'}
+        for name in fields:
+            if name in concrete:
+                columns.add(name)
+            columns.update(cls.field_sources.get(name, ()))
+        return columns
+
+
+class TaskBulkItemSerializer(serializers.Serializer):
+    """
+    One entry of a ``tasks/bulk/`` request.
+
+    ``assigned_to`` is a plain id here; the view checks all ids with one query
+    instead of a lookup per item.
+    """
+    title = serializers.CharField(max_length=255)
+    description = serializers.CharField()
+    assigned_to = serializers.IntegerField()
+    status = serializers.ChoiceField(
+        choices=Task.INITIAL_STATUSES, default='TODO')
+    queue_order = serializers.IntegerField(min_value=0, required=False)
+
+
+class AttachmentUploadSerializer(serializers.ModelSerializer):
+    size = serializers.IntegerField(
+        min_value=1, max_value=settings.TASK_UPLOAD_MAX_SIZE)
+
+    class Meta:
+        model = AttachmentUpload
+        fields = ('id', 'task', 'file_type', 'filename', 'size', 'offset',
+                  'created_at', 'updated_at')
+        read_only_fields = ('task', 'offset')
@@ -0,0 +1,108 @@
+"""
+Serving stored files with HTTP Range and conditional request support.
+
+With ``TASK_MEDIA_ACCEL`` set, the response only carries an
+``X-Accel-Redirect`` (nginx) or ``X-Sendfile`` (Apache/lighttpd) header and
+the front server streams the file, handling Range itself.
+"""
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+BLOCK_SIZE = 64 * 1024
+
+
+def parse_range(header, size):
+    """
+    ``(start, end)`` inclusive for a single ``bytes=`` range, ``None`` when
+    the header is absent or not understood (serve the whole file), or
+    ``False`` when it cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def read_range(path, start, length):
+    with open(path, 'rb') as fh:
+        fh.seek(start)
+        while length > 0:
+            block = fh.read(min(BLOCK_SIZE, length))
+            if not block:
+                break
+            length -= len(block)
+            yield block
+
+
+def serve_file(request, field_file, max_age=3600):
+    path = field_file.path
+    stat = os.stat(path)
+    size = stat.st_size
+    last_modified = int(stat.st_mtime)
+    etag = quote_etag(f'{stat.st_ino:x}-{size:x}-{last_modified:x}')
+    content_type = (mimetypes.guess_type(path)[0]
+                    or 'application/octet-stream')
+
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        return response
+
+    accel = getattr(settings, 'TASK_MEDIA_ACCEL', None)
+    if accel:
+        response = HttpResponse(content_type=content_type)
+        if accel == 'x-accel-redirect':
+            response['X-Accel-Redirect'] = (
+                settings.TASK_MEDIA_ACCEL_PREFIX + field_file.name)
+        else:
+            response['X-Sendfile'] = path
+    else:
+        byte_range = parse_range(request.headers.get('Range'), size)
+        if_range = request.headers.get('If-Range')
+        if byte_range and if_range and if_range != etag and (
+                parse_http_date_safe(if_range) != last_modified):
+            # The client's copy is stale: send the whole new file.
+            byte_range = None
+
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+        if byte_range:
+            start, end = byte_range
+            length = end - start + 1
+            response = StreamingHttpResponse(
+                read_range(path, start, length), status=206,
+                content_type=content_type)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        else:
+            length = size
+            response = StreamingHttpResponse(
+                read_range(path, 0, size), content_type=content_type)
+        response['Content-Length'] = str(length)
+        response['Accept-Ranges'] = 'bytes'
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = f'private, max-age={max_age}'
+    return response
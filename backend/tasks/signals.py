@@ -0,0 +1,102 @@
+import os
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import blobs, directory
+from .authentication import user_cache
+from .events import publish_task_event
+from .models import (AttachmentUpload, Programmer, ProgrammerStats, Task,
+                     TaskAttachment, TaskTombstone, User)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def touch_programmer(sender, instance, **kwargs):
+    """Names shown for a programmer live on User, so bump its validator."""
+    if instance.programmer_id:
+        Programmer.objects.filter(pk=instance.programmer_id).update(
+            updated_at=timezone.now())
+        directory.invalidate(instance.programmer_id)
+
+
+@receiver(post_save, sender=Programmer)
+@receiver(post_delete, sender=Programmer)
+def invalidate_programmer_directory(sender, instance, **kwargs):
+    directory.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    user_cache.discard(str(instance.pk))
+
+
+@receiver(post_delete, sender=Programmer)
+def forget_cached_programmer_users(sender, instance, **kwargs):
+    # User.programmer is nulled by an UPDATE, which sends no User signals
+    user_cache.clear()
+
+
+@receiver(post_delete, sender=Task)
+def record_task_tombstone(sender, instance, **kwargs):
+    """Also fires for tasks removed by a cascade from Programmer."""
+    TaskTombstone.objects.create(
+        task_id=instance.pk, assigned_to_id=instance.assigned_to_id)
+    counted = getattr(instance, '_counted', None)
+    if counted:
+        ProgrammerStats.apply_moves([(counted, None)])
+    publish_task_event(instance, 'deleted')
+
+
+@receiver(post_save, sender=Task)
+def announce_task_saved(sender, instance, created, **kwargs):
+    publish_task_event(instance, 'created' if created else 'updated')
+
+
+@receiver(post_delete, sender=TaskAttachment)
+def release_attachment_blob(sender, instance, **kwargs):
+    if instance.blob_id:
+        blobs.release(instance.blob_id)
+    if instance.thumbnail_blob_id:
+        blobs.release(instance.thumbnail_blob_id)
+
+
+@receiver(post_delete, sender=AttachmentUpload)
+def remove_upload_part(sender, instance, **kwargs):
+    """Also fires for uploads removed by a cascade from their task."""
+    part_path = instance.part_path
+
+    def remove():
+        try:
+            os.remove(part_path)
+        except FileNotFoundError:
+            pass
+    transaction.on_commit(remove)
+
+
+@receiver(post_save, sender=TaskAttachment)
+@receiver(post_delete, sender=TaskAttachment)
+def touch_attachment_task(sender, instance, origin=None, **kwargs):
+    """
+    Attachments are part of the task representation: bump the task's
+    updated_at so validators and cached fragments change with them.
+    """
+    origin_model = getattr(origin, 'model', type(origin))
+    if origin is not None and origin_model is not TaskAttachment:
+        # Deleted along with its task or programmer
+        return
+    Task.objects.filter(pk=instance.task_id).update(updated_at=timezone.now())
+
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, using, **kwargs):
+    if sender.name != 'tasks':
+        return
+    from django.db import connections
+
+    from .search import get_search_backend
+
+    get_search_backend(using).ensure_triggers(connections[using])
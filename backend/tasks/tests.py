@@ -1,3 +1,1097 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.cache import cache, caches
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import (AsyncClient, SimpleTestCase, TestCase,
+                         override_settings)
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import blobs, events, jobs, media, routers
+from .analytics import cycle_times
+from .authentication import CachedJWTAuthentication, user_cache
+from .search import get_search_backend
+from .models import (AttachmentBlob, AttachmentUpload, Job, Programmer, ProgrammerStats, Task,
+                     TaskAttachment, TaskTombstone, User)
+
+
+class KeysetPaginationPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            'admin', password='x', is_staff=True)
+        cls.programmer = Programmer.objects.create()
+        cls.user = User.objects.create_user(
+            'dev', password='x', programmer=cls.programmer, is_programmer=True)
+        # Several tasks per queue_order so the cursor needs its tie-breakers
+        Task.objects.bulk_create([
+            Task(title=f'Task {i}', description='d', assigned_to=cls.programmer,
+                 queue_order=(i // 3) * Task.QUEUE_GAP)
+            for i in range(300)
+        ])
+
+    def page_query_plan(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        first = client.get('/api/tasks/?page_size=50').json()
+        with CaptureQueriesContext(connection) as queries:
+            second = client.get(first['next'])
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(len(second.json()['results']), 50)
+        page_sql = next(q['sql'] for q in queries.captured_queries
+                        if 'LIMIT 51' in q['sql'])
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + page_sql)
+            return ' '.join(row[-1] for row in cursor.fetchall())
+
+    def test_staff_page_uses_index_without_sorting(self):
+        plan = self.page_query_plan(self.admin)
+        self.assertIn('task_queue_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_programmer_page_uses_index_without_sorting(self):
+        plan = self.page_query_plan(self.user)
+        self.assertIn('task_assignee_queue_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_pages_cover_every_task_once(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        seen = []
+        url = '/api/tasks/?page_size=70&fields=id'
+        while url:
+            data = client.get(url).json()
+            seen += [row['id'] for row in data['results']]
+            url = data['next']
+        self.assertEqual(sorted(seen), sorted(Task.objects.values_list('id', flat=True)))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_unknown_fields_are_rejected(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        for query in ('fields=bogus', 'fields=id,title&expand=bogus'):
+            response = client.get(f'/api/tasks/?{query}')
+            self.assertEqual(response.status_code, 400, query)
+            self.assertEqual(response.json(), {'fields': ["Noma'lum maydon: bogus"]})
+        self.assertEqual(client.get('/api/tasks/?fields=id&expand=attachments')
+                         .status_code, 200)
+
+
+class AttachmentUploadStampTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            'admin', password='x', is_staff=True)
+        cls.programmer = Programmer.objects.create()
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def assertStampedAfterAttachments(self, task_id):
+        task = Task.objects.get(pk=task_id)
+        attachments = list(task.attachments.all())
+        self.assertTrue(attachments)
+        for attachment in attachments:
+            self.assertGreaterEqual(task.updated_at, attachment.created_at)
+
+    def upload(self, name='a.mp3'):
+        return SimpleUploadedFile(name, b'audio bytes')
+
+    def test_create_and_update_stamp_the_task_after_its_attachments(self):
+        response = self.client.post('/api/tasks/', {
+            'title': 'Task', 'description': 'd',
+            'assigned_to': self.programmer.pk, 'audios': self.upload(),
+        }, format='multipart')
+        self.assertEqual(response.status_code, 201)
+        self.assertStampedAfterAttachments(response.json()['id'])
+
+        task_id = response.json()['id']
+        etag = self.client.get(f'/api/tasks/{task_id}/')['ETag']
+        response = self.client.patch(f'/api/tasks/{task_id}/', {
+            'audios': self.upload('b.mp3')}, format='multipart')
+        self.assertEqual(response.json()['updated_at'],
+                         self.client.get(f'/api/tasks/{task_id}/').json()['updated_at'])
+        self.assertStampedAfterAttachments(task_id)
+        self.assertNotEqual(self.client.get(f'/api/tasks/{task_id}/')['ETag'], etag)
+
+    def test_bulk_create_stamps_tasks_after_their_attachments(self):
+        items = [{'title': 'Task', 'description': 'd',
+                  'assigned_to': self.programmer.pk}]
+        response = self.client.post('/api/tasks/bulk/', {
+            'tasks': json.dumps(items), 'audios_0': self.upload(),
+        }, format='multipart')
+        self.assertStampedAfterAttachments(response.json()['created'][0]['id'])
+
+
+class ListValidatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            'admin', password='x', is_staff=True)
+        cls.programmer = Programmer.objects.create()
+        Task.objects.bulk_create([
+            Task(title=f'Task {i}', description='d', assigned_to=cls.programmer,
+                 queue_order=(i + 1) * Task.QUEUE_GAP)
+            for i in range(20)
+        ])
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_page_validators_do_not_aggregate_the_list(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/tasks/?page_size=5')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([q for q in queries.captured_queries
+                          if 'COUNT(' in q['sql'] or 'MAX(' in q['sql']])
+        self.assertEqual(self.client.get(
+            '/api/tasks/?page_size=5',
+            HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_projected_page_validators_do_not_load_deferred_columns(self):
+        # The page and the assignee timestamps; no lazy load per row
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/tasks/?fields=id,title&page_size=10')
+        self.assertEqual(len(response.json()['results']), 10)
+
+    def test_deleting_a_task_changes_the_list_validators(self):
+        response = self.client.get('/api/tasks/')
+        self.assertNotIn('Last-Modified', response)
+        page = self.client.get('/api/tasks/?page_size=5')
+
+        Task.objects.filter(pk=page.json()['results'][0]['id']).delete()
+        self.assertEqual(self.client.get(
+            '/api/tasks/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+        self.assertEqual(self.client.get(
+            '/api/tasks/?page_size=5',
+            HTTP_IF_NONE_MATCH=page['ETag']).status_code, 200)
+
+
+class FetchPlanTests(TestCase):
+    """Query counts must not grow with the number of rows on a page."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            'admin', password='x', is_staff=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def add_rows(self, count):
+        for _ in range(count):
+            programmer = Programmer.objects.create()
+            User.objects.create_user(f'dev{programmer.pk}', password='x',
+                                     first_name='Dev', programmer=programmer)
+            task = Task.objects.create(title='Task', description='d',
+                                       assigned_to=programmer)
+            TaskAttachment.objects.create(task=task, file='a.jpg', file_type='IMAGE')
+        return task
+
+    def get(self, url):
+        # Cold caches: the fragment and name caches would hide the queries
+        for alias in caches:
+            caches[alias].clear()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_list_and_detail_queries_do_not_grow_with_rows(self):
+        for total in (3, 12):
+            task = self.add_rows(total - Task.objects.count())
+            with self.subTest(rows=total):
+                with self.assertNumQueries(3):
+                    self.assertEqual(len(self.get('/api/tasks/').json()), total)
+                with self.assertNumQueries(2):
+                    self.get('/api/tasks/?fields=id,title')
+                with self.assertNumQueries(3):
+                    self.get('/api/tasks/?fields=id,assigned_to_name')
+                with self.assertNumQueries(2):
+                    self.get(f'/api/tasks/{task.pk}/')
+                with self.assertNumQueries(2):
+                    self.get('/api/programmers/')
+
+
+class UserCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.programmer = Programmer.objects.create()
+        cls.user = User.objects.create_user(
+            'admin', password='x', is_staff=True, programmer=cls.programmer)
+
+    def setUp(self):
+        user_cache.clear()
+        self.addCleanup(user_cache.clear)
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def approve(self):
+        """(status, user lookups): approving is for staff only."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/tasks/bulk-transition/',
+                                        {'action': 'approve', 'ids': [1]}, format='json')
+        lookups = [q for q in queries.captured_queries
+                   if 'FROM "tasks_user"' in q['sql']]
+        return response.status_code, len(lookups)
+
+    def test_user_is_read_once_per_ttl(self):
+        self.assertEqual(self.approve(), (200, 1))
+        self.assertEqual(self.approve(), (200, 0))
+        with override_settings(TASK_AUTH_USER_CACHE_TTL=-1):
+            user_cache.clear()
+            self.approve()
+            self.assertEqual(self.approve(), (200, 1))
+
+    def test_saving_the_user_takes_effect_at_once(self):
+        self.approve()
+        self.user.is_staff = False
+        self.user.save()
+        self.assertEqual(self.approve(), (403, 1))
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        # Queryset updates send no signals: picked up after the TTL
+        self.assertEqual(self.approve(), (403, 0))
+        User.objects.get(pk=self.user.pk).save()
+        self.assertEqual(self.approve(), (401, 1))
+
+    def test_deleted_users_and_programmers_are_dropped(self):
+        self.approve()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.programmer.delete()
+        self.assertIsNone(user_cache.get(str(self.user.pk)))
+        self.approve()
+        fields = [f.attname for f in User._meta.concrete_fields
+                  if f.attname in CachedJWTAuthentication.cached_fields]
+        cached = dict(zip(fields, user_cache.get(str(self.user.pk))))
+        self.assertIsNone(cached['programmer_id'])
+        self.user.delete()
+        self.assertEqual(self.approve(), (401, 1))
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], DATABASE_REPLICA_PIN_CACHE='default')
+class ReplicaPinTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.router = routers.PrimaryReplicaRouter()
+        self.token = routers.use_replicas(True)
+        self.addCleanup(routers.reset_replicas, self.token)
+
+    def test_reads_use_replicas_until_the_user_writes(self):
+        routers.pin_recent_writer(1)
+        self.assertEqual(self.router.db_for_read(Task), 'replica')
+
+        routers.remember_write(1)
+        routers.pin_recent_writer(2)
+        self.assertEqual(self.router.db_for_read(Task), 'replica')
+        routers.pin_recent_writer(1)
+        self.assertEqual(self.router.db_for_read(Task), 'default')
+
+    def test_objects_of_other_aliases_stay_there(self):
+        programmer, task = Programmer(), Task()
+        programmer._state.db = 'scratch'
+        self.assertEqual(self.router.db_for_write(Task, instance=programmer), 'scratch')
+        task._state.db = 'scratch'
+        self.assertTrue(self.router.allow_relation(programmer, task))
+
+        programmer._state.db = 'replica'
+        self.assertEqual(self.router.db_for_write(Task, instance=programmer), 'default')
+
+    def test_cache_fills_read_from_the_primary(self):
+        with routers.primary_reads():
+            self.assertEqual(self.router.db_for_read(Task), 'default')
+        self.assertEqual(self.router.db_for_read(Task), 'replica')
+
+
+def record_lease():
+    JobLeaseTests.leases = list(Job.objects.filter(status='RUNNING').values_list(
+        'locked_by', 'locked_until'))
+
+
+class JobLeaseTests(TestCase):
+    def test_eager_run_leases_the_job_until_it_finishes(self):
+        job = jobs.enqueue(record_lease)
+        before = timezone.now()
+        self.assertTrue(jobs.run_job(job.pk, mark_running=True))
+
+        [(locked_by, locked_until)] = self.leases
+        self.assertEqual(locked_by, jobs.worker_name())
+        self.assertGreaterEqual(locked_until,
+                                before + jobs.DEFAULT_VISIBILITY_TIMEOUT)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_until), ('DONE', None))
+
+    def test_expired_lease_is_retried_until_attempts_run_out(self):
+        expired = timezone.now() - timedelta(seconds=1)
+        retry = jobs.enqueue(record_lease, max_attempts=3)
+        exhausted = jobs.enqueue(record_lease, max_attempts=3)
+        Job.objects.filter(pk=retry.pk).update(
+            status='RUNNING', attempts=2, locked_until=expired)
+        Job.objects.filter(pk=exhausted.pk).update(
+            status='RUNNING', attempts=3, locked_until=expired)
+
+        self.assertEqual(jobs.claim(10, 'worker'), [retry.pk])
+        exhausted.refresh_from_db()
+        self.assertEqual((exhausted.status, exhausted.attempts), ('FAILED', 3))
+        self.assertEqual(jobs.claim(10, 'worker'), [])
+
+
+class DeltaSyncTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            'admin', password='x', is_staff=True)
+        cls.programmer = Programmer.objects.create()
+        cls.task = Task.objects.create(
+            title='Task', description='d', assigned_to=cls.programmer)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_cursor_can_be_pasted_into_a_url(self):
+        cursor = self.client.get('/api/tasks/changes/').json()['cursor']
+        self.assertTrue(cursor.isdigit())
+        Task.objects.filter(pk=self.task.pk).update(
+            title='Renamed', updated_at=timezone.now())
+
+        data = self.client.get(f'/api/tasks/changes/?since={cursor}').json()
+        self.assertEqual([task['title'] for task in data['changed']], ['Renamed'])
+
+    def test_rows_committed_after_the_read_are_not_skipped(self):
+        cursor = self.client.get('/api/tasks/changes/').json()['cursor']
+        # Stamped before that read, committed after it (e.g. reject)
+        Task.objects.filter(pk=self.task.pk).update(
+            title='Late', updated_at=timezone.now() - timedelta(seconds=1))
+
+        data = self.client.get(f'/api/tasks/changes/?since={cursor}').json()
+        self.assertEqual([task['title'] for task in data['changed']], ['Late'])
+
+    def test_reassigned_task_is_dropped_by_the_old_assignee_only(self):
+        old = User.objects.create_user(
+            'old', password='x', programmer=self.programmer, is_programmer=True)
+        new_programmer = Programmer.objects.create()
+        new = User.objects.create_user(
+            'new', password='x', programmer=new_programmer, is_programmer=True)
+        cursors = {}
+        for user in (old, new, self.admin):
+            self.client.force_authenticate(user)
+            cursors[user] = self.client.get('/api/tasks/changes/').json()['cursor']
+
+        self.task.assigned_to = new_programmer
+        self.task.save()
+
+        expected = {old: ([], [self.task.pk]), new: ([self.task.pk], []),
+                    self.admin: ([self.task.pk], [])}
+        for user, (changed, deleted) in expected.items():
+            self.client.force_authenticate(user)
+            data = self.client.get(
+                f'/api/tasks/changes/?since={cursors[user]}').json()
+            self.assertEqual(([task['id'] for task in data['changed']],
+                              data['deleted']), (changed, deleted), user)
+
+    def test_pruned_tombstones_are_not_trusted(self):
+        Task.objects.filter(pk=self.task.pk).delete()
+        TaskTombstone.objects.update(deleted_at=timezone.now() - timedelta(days=40))
+        call_command('prune_tombstones', '--days=30', stdout=StringIO())
+        self.assertFalse(TaskTombstone.objects.exists())
+
+        since = (timezone.now() - timedelta(days=31)).isoformat()
+        response = self.client.get('/api/tasks/changes/', {'since': since})
+        self.assertEqual(response.status_code, 410)
+
+
+class AttachmentUrlTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+
+        programmer = Programmer.objects.create()
+        self.user = User.objects.create_user(
+            'dev', password='x', programmer=programmer, is_programmer=True)
+        task = Task.objects.create(
+            title='Task', description='d', assigned_to=programmer)
+        self.attachment = TaskAttachment(task=task, file_type='IMAGE')
+        self.attachment.file.save('photo.jpg', ContentFile(b'original'), save=False)
+        self.attachment.thumbnail.save('thumb.jpg', ContentFile(b'preview'), save=False)
+        self.attachment.save()
+
+    def test_urls_point_at_the_checked_file_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        [data] = client.get(f'/api/tasks/{self.attachment.task_id}/').json()['attachments']
+        base = f'http://testserver/api/attachments/{self.attachment.pk}/file/'
+        self.assertEqual((data['file'], data['thumbnail']),
+                         (base, base + '?variant=thumbnail'))
+
+        # Loaded by <img>/<video>: no header, the token rides in the query
+        token = AccessToken.for_user(self.user)
+        for url, body in ((data['file'], b'original'), (data['thumbnail'], b'preview')):
+            separator = '&' if '?' in url else '?'
+            response = APIClient().get(f'{url}{separator}token={token}')
+            self.assertEqual(b''.join(response.streaming_content), body)
+            self.assertEqual(APIClient().get(url).status_code, 401)
+
+    def test_errors_are_rendered_as_json(self):
+        url = f'/api/attachments/{self.attachment.pk}/file/'
+        for accept in ('*/*', 'image/avif,image/webp,*/*;q=0.8'):
+            response = APIClient().get(url, HTTP_ACCEPT=accept)
+            self.assertEqual((response.status_code, response['Content-Type']),
+                             (401, 'application/json'), accept)
+            self.assertIn('detail', response.json())
+
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get(f'/api/attachments/{self.attachment.pk + 1}/file/',
+                              HTTP_ACCEPT='image/*')
+        self.assertEqual((response.status_code, response['Content-Type']),
+                         (404, 'application/json'))
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            'admin', password='x', is_staff=True)
+        cls.programmer, other = Programmer.objects.create(), Programmer.objects.create()
+        cls.user = User.objects.create_user(
+            'dev', password='x', programmer=cls.programmer, is_programmer=True)
+        cls.in_title = Task.objects.create(
+            title='Login sahifasi', description='Tugma rangi',
+            assigned_to=cls.programmer)
+        cls.in_description = Task.objects.create(
+            title='Profil', description='Login tugmasini qo\'shish',
+            assigned_to=cls.programmer)
+        cls.other_programmers = Task.objects.create(
+            title='Login xatosi', description='d', assigned_to=other)
+
+    def matches(self, query):
+        backend = get_search_backend()
+        return set(backend.filter(Task.objects.all(), query)
+                   .values_list('title', flat=True))
+
+    def test_index_follows_every_write_path(self):
+        Task.objects.bulk_create([Task(title='Hisobot', description='d',
+                                       assigned_to=self.programmer)])
+        self.assertEqual(self.matches('hisobot'), {'Hisobot'})
+        Task.objects.filter(title='Hisobot').update(title='Eksport')
+        self.assertEqual((self.matches('hisobot'), self.matches('eksport')),
+                         (set(), {'Eksport'}))
+        task = Task.objects.get(title='Eksport')
+        task.description = 'Excel fayl'
+        task.save()
+        self.assertEqual(self.matches('excel'), {'Eksport'})
+        task.delete()
+        self.assertEqual(self.matches('eksport'), set())
+
+    def test_triggers_are_restored_after_migrate(self):
+        # What a table rebuild during a later migration does to them
+        with connection.cursor() as cursor:
+            for name in get_search_backend().triggers:
+                cursor.execute(f'DROP TRIGGER {name}')
+        call_command('migrate', verbosity=0)
+        Task.objects.create(title='Bildirishnoma', description='d',
+                            assigned_to=self.programmer)
+        self.assertEqual(self.matches('bildirish'), {'Bildirishnoma'})
+
+    def test_title_hits_rank_first_and_syntax_is_inert(self):
+        backend = get_search_backend()
+        queryset = Task.objects.filter(assigned_to=self.programmer)
+        self.assertEqual(backend.ranked_ids(queryset, 'login', 10),
+                         [self.in_title.pk, self.in_description.pk])
+        self.assertEqual(backend.ranked_ids(queryset, 'login', 1), [self.in_title.pk])
+        # Words are prefix matched while typing
+        self.assertEqual(backend.ranked_ids(queryset, 'log', 10),
+                         [self.in_title.pk, self.in_description.pk])
+        self.assertEqual(backend.ranked_ids(queryset, 'login" OR title:*', 10),
+                         [])
+
+    def test_endpoint_searches_the_visible_tasks(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get('/api/tasks/search/?q=login')
+        self.assertEqual([t['id'] for t in response.json()['results']],
+                         [self.in_title.pk, self.in_description.pk])
+
+        client.force_authenticate(self.admin)
+        response = client.get('/api/tasks/search/?q=login&limit=1000')
+        self.assertEqual(len(response.json()['results']), 3)
+        response = client.get(
+            f'/api/tasks/search/?q=login&assigned_to={self.programmer.pk}&limit=1')
+        self.assertEqual([t['id'] for t in response.json()['results']],
+                         [self.in_title.pk])
+        for query in ('', '?q=%20', '?q=login&limit=x'):
+            self.assertEqual(client.get(f'/api/tasks/search/{query}').status_code,
+                             400, query)
+
+
+class BulkTransitionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            'admin', password='x', is_staff=True)
+        cls.programmer, cls.other = Programmer.objects.create(), Programmer.objects.create()
+        cls.user = User.objects.create_user(
+            'dev', password='x', programmer=cls.programmer, is_programmer=True)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def make(self, status, count=1, programmer=None):
+        return [Task.objects.create(title='Task', description='d', status=status,
+                                    assigned_to=programmer or self.programmer)
+                for _ in range(count)]
+
+    def post(self, action, ids, **data):
+        return self.client.post('/api/tasks/bulk-transition/',
+                                {'action': action, 'ids': ids, **data}, format='json')
+
+    def test_outcomes_per_id(self):
+        done, pending = self.make('DONE')[0], self.make('PENDING')[0]
+        missing = pending.pk + 100
+        response = self.post('approve', [done.pk, pending.pk, missing])
+        self.assertEqual(response.json()['results'], {
+            str(done.pk): 'ok', str(pending.pk): 'conflict', str(missing): 'not_found'})
+        done.refresh_from_db()
+        self.assertEqual(done.status, 'APPROVED')
+        self.assertIsNotNone(done.approved_at)
+        self.assertEqual(Task.objects.get(pk=pending.pk).status, 'PENDING')
+        stats = ProgrammerStats.objects.get(programmer=self.programmer)
+        self.assertEqual((stats.approved, stats.done, stats.pending), (1, 0, 1))
+
+    def test_reject_requeues_only_the_rejected_tasks(self):
+        done, todo = self.make('DONE', 2), self.make('TODO')
+        self.assertEqual(self.post('reject', [done[0].pk]).status_code, 400)
+        response = self.post('reject', [t.pk for t in done + todo], reason='Xato')
+        self.assertEqual(list(response.json()['results'].values()),
+                         ['ok', 'ok', 'conflict'])
+        copies = Task.objects.exclude(pk__in=[t.pk for t in done + todo])
+        self.assertEqual(
+            [(c.status, c.rejection_reason) for c in copies],
+            [('TODO', 'Qayta bajarish (sabab: Xato)')] * 2)
+        self.assertEqual(len({c.queue_order for c in copies}), 2)
+
+    def test_programmers_only_start_their_own_tasks(self):
+        mine, theirs = self.make('PENDING')[0], self.make('PENDING', programmer=self.other)[0]
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.post('approve', [mine.pk]).status_code, 403)
+        response = self.post('start', [mine.pk, theirs.pk])
+        self.assertEqual(response.json()['results'],
+                         {str(mine.pk): 'ok', str(theirs.pk): 'not_found'})
+        self.assertEqual(Task.objects.get(pk=theirs.pk).status, 'PENDING')
+
+    def test_queries_do_not_grow_with_the_batch(self):
+        counts = []
+        for size in (2, 10):
+            ids = [t.pk for t in self.make('DONE', size)]
+            with CaptureQueriesContext(connection) as queries:
+                self.post('reject', ids, reason='Xato')
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_invalid_requests(self):
+        for data in ({'action': 'delete', 'ids': [1]}, {'action': 'start', 'ids': []},
+                     {'action': 'start', 'ids': ['x']},
+                     {'action': 'start', 'ids': list(range(501))}):
+            response = self.client.post('/api/tasks/bulk-transition/', data, format='json')
+            self.assertEqual(response.status_code, 400, data)
+
+
+class CycleTimeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.first, cls.second = Programmer.objects.create(), Programmer.objects.create()
+        cls.user = User.objects.create_user(
+            'dev', password='x', programmer=cls.first, is_programmer=True)
+        # Wednesdays, so the weeks do not depend on the time zone
+        weeks = [datetime(2026, 3, 4, 12, tzinfo=dt_timezone.utc),
+                 datetime(2026, 3, 11, 12, tzinfo=dt_timezone.utc)]
+        for minutes, programmer, week in ((10, cls.first, 0), (20, cls.first, 0),
+                                          (30, cls.first, 1), (40, cls.first, 1),
+                                          (60, cls.second, 1)):
+            todo_at = weeks[week] + timedelta(hours=1)
+            task = Task.objects.create(title='Task', description='d',
+                                       assigned_to=programmer)
+            Task.objects.filter(pk=task.pk).update(
+                status='DONE', created_at=weeks[week], todo_at=todo_at,
+                done_at=todo_at + timedelta(minutes=minutes))
+        # Unfinished: no todo_to_done duration
+        Task.objects.create(title='Task', description='d', assigned_to=cls.first)
+
+    def todo_to_done(self, entry):
+        return {key: value / 60 if key != 'count' and value is not None else value
+                for key, value in entry['todo_to_done'].items()}
+
+    def test_percentiles_per_group_in_one_query(self):
+        with self.assertNumQueries(1):
+            result = cycle_times(Task.objects.all())
+        self.assertEqual(self.todo_to_done(result['overall']),
+                         {'count': 5, 'avg': 32, 'p50': 30, 'p90': 60})
+        self.assertEqual(result['overall']['total_time']['count'], 0)
+        self.assertEqual(
+            [(row['programmer'], self.todo_to_done(row))
+             for row in result['by_programmer']],
+            [(self.first.pk, {'count': 4, 'avg': 25, 'p50': 20, 'p90': 40}),
+             (self.second.pk, {'count': 1, 'avg': 60, 'p50': 60, 'p90': 60})])
+        self.assertEqual(
+            [(row['week'], self.todo_to_done(row)) for row in result['by_week']],
+            [('2026-03-02', {'count': 2, 'avg': 15, 'p50': 10, 'p90': 20}),
+             ('2026-03-09', {'count': 3, 'avg': 130 / 3, 'p50': 40, 'p90': 60})])
+
+    def test_endpoint_reports_the_visible_filtered_tasks(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.get('/api/tasks/analytics/?created_after=2026-03-09')
+        self.assertEqual(self.todo_to_done(response.json()['overall']),
+                         {'count': 2, 'avg': 35, 'p50': 30, 'p90': 40})
+
+
+class BlobRefCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            'admin', password='x', is_staff=True)
+        cls.programmer = Programmer.objects.create()
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=self.media_root))
+
+    def stored_files(self):
+        return sorted(name for _, _, names in os.walk(self.media_root)
+                      for name in names)
+
+    def create_task(self, name):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.post('/api/tasks/', {
+            'title': 'Task', 'description': 'd', 'assigned_to': self.programmer.pk,
+            'audios': SimpleUploadedFile(name, b'same audio'),
+        }, format='multipart')
+        return Task.objects.get(pk=response.json()['id'])
+
+    def test_identical_uploads_share_one_file_until_the_last_is_gone(self):
+        first, second = self.create_task('a.mp3'), self.create_task('b.mp3')
+        blob = AttachmentBlob.objects.get()
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(set(TaskAttachment.objects.values_list('file', flat=True)),
+                         {blob.file.name})
+        self.assertEqual(len(self.stored_files()), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.attachments.get().delete()
+        self.assertEqual(AttachmentBlob.objects.get().ref_count, 1)
+        self.assertEqual(len(self.stored_files()), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(AttachmentBlob.objects.exists())
+        self.assertEqual(self.stored_files(), [])
+
+    def test_blob_reused_before_collection_is_kept(self):
+        blob = blobs.store(ContentFile(b'data'), 'a.mp3')
+        with self.captureOnCommitCallbacks(execute=True):
+            blobs.release(blob.pk)
+            self.assertEqual(blobs.store(ContentFile(b'data'), 'a.mp3').pk, blob.pk)
+        self.assertEqual(AttachmentBlob.objects.get().ref_count, 1)
+        self.assertTrue(blob.file.storage.exists(blob.file.name))
+
+    def test_concurrently_stored_content_uses_the_other_blob(self):
+        theirs = blobs.store(ContentFile(b'data'), 'a.mp3')
+        # Their insert lands between our failed acquire and our save
+        acquire, calls = blobs.acquire, []
+
+        def lose_first_race(*args):
+            calls.append(args)
+            return len(calls) > 1 and acquire(*args)
+
+        with mock.patch.object(blobs, 'acquire', side_effect=lose_first_race):
+            self.assertEqual(blobs.store(ContentFile(b'data'), 'a.mp3').pk, theirs.pk)
+        self.assertEqual(AttachmentBlob.objects.get().ref_count, 2)
+        self.assertEqual(self.stored_files(), [os.path.basename(theirs.file.name)])
+
+
+class ThumbnailBlobTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        programmer = Programmer.objects.create()
+        self.task = Task.objects.create(title='Task', description='d',
+                                        status='DONE', assigned_to=programmer)
+
+    def attach(self, content):
+        blob = blobs.store(ContentFile(content), 'photo.jpg')
+        attachment = TaskAttachment.objects.create(
+            task=self.task, file_type='IMAGE', blob=blob, file=blob.file.name)
+        media.store_result(attachment.pk, {'thumbnail': b'preview', 'width': 1})
+        attachment.refresh_from_db()
+        return attachment
+
+    def test_thumbnails_are_shared_and_removed_with_the_last_user(self):
+        first, second = self.attach(b'one'), self.attach(b'two')
+        self.assertEqual(first.thumbnail_blob_id, second.thumbnail_blob_id)
+        thumbnail = first.thumbnail_blob
+        self.assertEqual(first.thumbnail.name, thumbnail.file.name)
+        with self.captureOnCommitCallbacks(execute=True):
+            [copy] = Task.bulk_requeue([self.task], 'Qayta')
+        self.assertEqual(AttachmentBlob.objects.get(pk=thumbnail.pk).ref_count, 4)
+
+        storage = thumbnail.file.storage
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.delete()
+        self.assertTrue(storage.exists(thumbnail.file.name))
+        with self.captureOnCommitCallbacks(execute=True):
+            copy.delete()
+        self.assertFalse(storage.exists(thumbnail.file.name))
+        self.assertFalse(AttachmentBlob.objects.exists())
+
+    def test_reprocessing_releases_the_old_thumbnail(self):
+        attachment = self.attach(b'one')
+        old = attachment.thumbnail_blob
+        with self.captureOnCommitCallbacks(execute=True):
+            media.store_result(attachment.pk, {'thumbnail': b'new preview'})
+        self.assertFalse(AttachmentBlob.objects.filter(pk=old.pk).exists())
+        self.assertFalse(old.file.storage.exists(old.file.name))
+
+
+class EventBrokerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            'admin', password='x', is_staff=True)
+        cls.programmer = Programmer.objects.create()
+        cls.user = User.objects.create_user(
+            'dev', password='x', programmer=cls.programmer, is_programmer=True)
+        cls.other = Programmer.objects.create()
+
+    def setUp(self):
+        self.broker = events.InProcessBroker()
+        previous, events._broker = events._broker, self.broker
+        self.addCleanup(setattr, events, '_broker', previous)
+
+    def create_tasks(self):
+        """One task for ``self.user`` and one for another programmer."""
+        with mock.patch.object(self.broker, 'publish',
+                               wraps=self.broker.publish) as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                own = Task.objects.create(
+                    title='Own', description='d', assigned_to=self.programmer)
+                Task.objects.create(
+                    title='Other', description='d', assigned_to=self.other)
+                # Nothing is delivered before the transaction commits
+                publish.assert_not_called()
+            self.assertEqual(publish.call_count, 2)
+        return own
+
+    async def drain(self, subscription):
+        await asyncio.sleep(0)  # let call_soon_threadsafe pushes run
+        received = []
+        while not subscription.queue.empty():
+            received.append(subscription.queue.get_nowait())
+        return received
+
+    async def test_subscribers_only_see_their_tasks_after_commit(self):
+        staff = self.broker.subscribe(events.visible_to(self.admin))
+        programmer = self.broker.subscribe(events.visible_to(self.user))
+
+        own = await sync_to_async(self.create_tasks)()
+
+        staff_events = await self.drain(staff)
+        self.assertEqual([e['event'] for e in staff_events], ['created', 'created'])
+        [event] = await self.drain(programmer)
+        self.assertEqual((event['event'], event['task'], event['assigned_to']),
+                         ('created', own.pk, self.programmer.pk))
+
+        self.broker.unsubscribe(programmer)
+        self.broker.publish({'event': 'updated', 'task': own.pk,
+                             'assigned_to': self.programmer.pk})
+        self.assertEqual(await self.drain(programmer), [])
+        self.assertEqual(len(await self.drain(staff)), 1)
+
+    async def test_stream_unsubscribes_when_the_client_disconnects(self):
+        token = await sync_to_async(AccessToken.for_user)(self.user)
+        response = await AsyncClient().get(f'/api/tasks/events/?token={token}')
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 5000\n\n')
+        self.assertEqual(len(self.broker._subscribers), 1)
+
+        self.broker.publish({'event': 'updated', 'task': 1,
+                             'assigned_to': self.programmer.pk})
+        chunk = await anext(stream)
+        self.assertTrue(chunk.startswith(b'event: updated\n'))
+        self.assertEqual(json.loads(chunk.split(b'data: ')[1])['task'], 1)
+
+        # The ASGI handler cancels the response task when the client leaves
+        waiting = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiting
+        self.assertEqual(self.broker._subscribers, set())
+
+
+class BulkCreateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            'admin', password='x', is_staff=True)
+        cls.programmer = Programmer.objects.create()
+        Task.objects.create(title='Queued', description='d',
+                            assigned_to=cls.programmer, queue_order=5000)
+
+    def test_queue_end_is_read_under_the_queue_lock(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        lock, locked = Task.lock_queues, []
+
+        def lock_queues(programmer_ids):
+            locked.append(set(programmer_ids))
+            return lock(programmer_ids)
+
+        items = [{'title': f'New {i}', 'description': 'd',
+                  'assigned_to': pk} for i, pk in enumerate((self.programmer.pk, 999))]
+        with mock.patch.object(Task, 'lock_queues', side_effect=lock_queues):
+            response = client.post('/api/tasks/bulk/', {'tasks': items}, format='json')
+
+        # One lock covers the existence check and the queue end read
+        self.assertEqual(locked, [{self.programmer.pk, 999}])
+        self.assertEqual(response.json()['errors'],
+                         {'1': {'assigned_to': ['Programmist topilmadi']}})
+        self.assertEqual(Task.objects.get(title='New 0').queue_order,
+                         5000 + Task.QUEUE_GAP)
+
+
+class ProgrammerNameTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            'admin', password='x', is_staff=True)
+        cls.programmers = []
+        for i in range(6):
+            programmer = Programmer.objects.create()
+            User.objects.create_user(f'dev{i}', password='x', programmer=programmer,
+                                     first_name='Dev', last_name=str(i))
+            cls.programmers.append(programmer)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_projected_names_are_looked_up_in_one_batch(self):
+        for count in (2, 6):
+            Task.objects.all().delete()
+            for programmer in self.programmers[:count]:
+                Task.objects.create(title='Task', description='d',
+                                    assigned_to=programmer)
+            cache.clear()
+            # The page, the assignee timestamps and one User query
+            with self.assertNumQueries(3):
+                data = self.client.get(
+                    '/api/tasks/?fields=id,assigned_to_name&page_size=10').json()
+            self.assertEqual(sorted(row['assigned_to_name'] for row in data['results']),
+                             [f'Dev {i}' for i in range(count)])
+
+    def test_full_name_falls_back_to_the_username(self):
+        from django.contrib.admin.sites import site
+
+        programmer = Programmer.objects.create()
+        User.objects.create_user('nameless', password='x', programmer=programmer)
+        cache.clear()
+        full_names = {row['id']: row['full_name']
+                      for row in self.client.get('/api/programmers/').json()}
+        self.assertEqual(full_names[programmer.pk], 'nameless')
+        self.assertEqual(full_names[self.programmers[0].pk], 'Dev 0')
+        self.assertEqual(site._registry[Programmer].get_user_name(programmer),
+                         'nameless')
+
+
+class QueueKeyTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            'admin', password='x', is_staff=True)
+        cls.programmer = Programmer.objects.create()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_rework_copy_goes_after_finished_tasks(self):
+        done = [Task.objects.create(title=f'Done {i}', description='d', status='DONE',
+                                    assigned_to=self.programmer,
+                                    queue_order=(i + 1) * Task.QUEUE_GAP)
+                for i in range(3)]
+        response = self.client.post(f'/api/tasks/{done[0].pk}/reject/',
+                                    {'reason': 'Qayta'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        copy = Task.objects.exclude(pk__in=[t.pk for t in done]).get()
+        self.assertEqual(copy.queue_order, 4 * Task.QUEUE_GAP)
+
+    def test_single_creates_append_with_a_gap(self):
+        Task.objects.create(title='Done', description='d', status='DONE',
+                            assigned_to=self.programmer, queue_order=Task.QUEUE_GAP)
+        orders = []
+        for i in range(2):
+            response = self.client.post('/api/tasks/', {
+                'title': f'New {i}', 'description': 'd',
+                'assigned_to': self.programmer.pk}, format='json')
+            orders.append(response.json()['queue_order'])
+        self.assertEqual(orders, [2 * Task.QUEUE_GAP, 3 * Task.QUEUE_GAP])
+
+        response = self.client.post('/api/tasks/', {
+            'title': 'Placed', 'description': 'd', 'queue_order': 10,
+            'assigned_to': self.programmer.pk}, format='json')
+        self.assertEqual(response.json()['queue_order'], 10)
+
+
+class WorkflowTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            'admin', password='x', is_staff=True)
+        cls.programmer = Programmer.objects.create()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.task = Task.objects.create(title='Task', description='d', status='PENDING',
+                                        assigned_to=self.programmer)
+
+    def test_update_cannot_skip_the_workflow(self):
+        url = f'/api/tasks/{self.task.pk}/'
+        response = self.client.patch(url, {'status': 'APPROVED'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.patch(url, {'status': 'PENDING', 'title': 'Renamed',
+                                           'approved_at': timezone.now().isoformat()},
+                                     format='json')
+        self.assertEqual(response.status_code, 200)
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.status, self.task.title, self.task.approved_at),
+                         ('PENDING', 'Renamed', None))
+
+    def test_tasks_are_created_in_an_initial_status(self):
+        data = {'title': 'Task', 'description': 'd', 'assigned_to': self.programmer.pk}
+        self.assertEqual(self.client.post('/api/tasks/', {**data, 'status': 'DONE'},
+                                          format='json').status_code, 400)
+        response = self.client.post('/api/tasks/bulk/', {'tasks': [{**data, 'status': 'APPROVED'}]},
+                                    format='json')
+        self.assertIn('status', response.json()['errors']['0'])
+
+
+class ProgrammerStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.first, cls.second = Programmer.objects.create(), Programmer.objects.create()
+
+    def counts(self, programmer):
+        stats = ProgrammerStats.objects.filter(programmer=programmer).first()
+        if stats is None:
+            return {}
+        return {status.lower(): getattr(stats, status.lower())
+                for status, _ in Task.STATUS_CHOICES
+                if getattr(stats, status.lower())}
+
+    def test_counters_follow_create_transition_reassign_and_delete(self):
+        task = Task.objects.create(title='Task', description='d', status='PENDING',
+                                   assigned_to=self.first)
+        self.assertEqual(self.counts(self.first), {'pending': 1})
+        self.assertTrue(task.transition_to('TODO'))
+        self.assertEqual(self.counts(self.first), {'todo': 1})
+
+        task.assigned_to = self.second
+        task.save()
+        self.assertEqual((self.counts(self.first), self.counts(self.second)),
+                         ({}, {'todo': 1}))
+        Task.objects.get(pk=task.pk).delete()
+        self.assertEqual(self.counts(self.second), {})
+
+    def test_failed_counter_update_rolls_back_the_change(self):
+        task = Task.objects.create(title='Task', description='d', status='PENDING',
+                                   assigned_to=self.first)
+        with mock.patch.object(ProgrammerStats, 'apply_moves', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                task.transition_to('TODO')
+            task = Task.objects.get(pk=task.pk)
+            task.assigned_to = self.second
+            with self.assertRaises(RuntimeError):
+                task.save()
+        task = Task.objects.get(pk=task.pk)
+        self.assertEqual((task.status, task.assigned_to_id), ('PENDING', self.first.pk))
+        self.assertEqual(self.counts(self.first), {'pending': 1})
+
+
+class ChunkedUploadTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.programmer = Programmer.objects.create()
+        cls.user = User.objects.create_user(
+            'dev', password='x', programmer=cls.programmer, is_programmer=True)
+        cls.task = Task.objects.create(
+            title='Task', description='d', assigned_to=cls.programmer)
+
+    def setUp(self):
+        self.parts = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.parts, ignore_errors=True)
+        self.enterContext(override_settings(TASK_UPLOAD_TEMP_DIR=self.parts))
+        self.upload = AttachmentUpload.objects.create(
+            task=self.task, file_type='AUDIO', filename='a.mp3', size=8,
+            created_by=self.user)
+
+    def read_part(self):
+        with open(self.upload.part_path, 'rb') as part:
+            return part.read()
+
+    def test_losing_request_does_not_touch_the_part_file(self):
+        stale = AttachmentUpload.objects.get(pk=self.upload.pk)
+        self.assertTrue(self.upload.write_chunk(BytesIO(b'AAAA'), 0, 4))
+        self.assertFalse(stale.write_chunk(BytesIO(b'BBBB'), 0, 4))
+        self.assertEqual(self.read_part(), b'AAAA')
+        self.assertTrue(self.upload.write_chunk(BytesIO(b'CCCC'), 4, 4))
+        self.assertEqual(self.read_part(), b'AAAACCCC')
+
+    def test_part_files_are_removed_with_their_upload(self):
+        self.upload.write_chunk(BytesIO(b'AAAA'), 0, 4)
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.filter(pk=self.task.pk).delete()
+        self.assertEqual(os.listdir(self.parts), [])
+
+    def test_stale_uploads_and_orphaned_parts_are_purged(self):
+        self.upload.write_chunk(BytesIO(b'AAAA'), 0, 4)
+        fresh = AttachmentUpload.objects.create(
+            task=self.task, file_type='AUDIO', filename='b.mp3', size=8,
+            created_by=self.user)
+        fresh.write_chunk(BytesIO(b'BBBB'), 0, 4)
+        orphan = os.path.join(self.parts, 'lost.part')
+        open(orphan, 'wb').close()
+        old = (timezone.now() - timedelta(days=2)).timestamp()
+        os.utime(orphan, (old, old))
+        AttachmentUpload.objects.filter(pk=self.upload.pk).update(
+            updated_at=timezone.now() - timedelta(days=2))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('purge_uploads', stdout=StringIO())
+        self.assertEqual(list(AttachmentUpload.objects.values_list('pk', flat=True)),
+                         [fresh.pk])
+        self.assertEqual(os.listdir(self.parts), [f'{fresh.pk}.part'])
@@ -1,4 +1,6 @@
-from .views import TaskViewSet, ProgrammerViewSet, CustomTokenObtainPairView
+from .views import (TaskViewSet, ProgrammerViewSet, AttachmentUploadViewSet,
+                    TaskAttachmentViewSet,
+                    CustomTokenObtainPairView, task_events)
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenRefreshView
@@ -6,9 +8,12 @@ from rest_framework_simplejwt.views import TokenRefreshView
 router = DefaultRouter()
 router.register(r'tasks', TaskViewSet)
 router.register(r'programmers', ProgrammerViewSet)
+router.register(r'uploads', AttachmentUploadViewSet)
+router.register(r'attachments', TaskAttachmentViewSet)
 
 urlpatterns = [
     path('login/', CustomTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('tasks/events/', task_events, name='task_events'),
     path('', include(router.urls)),
 ]
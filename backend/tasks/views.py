@@ -1,8 +1,17 @@
-from rest_framework import viewsets, permissions, status, generics
+from rest_framework import viewsets, permissions, status, generics, filters, mixins, renderers
 from rest_framework.response import Response
 from rest_framework.decorators import action
-from .models import Task, Programmer, TaskAttachment, User
-from .serializers import TaskSerializer, UserSerializer, ProgrammerSerializer
+from .models import (Task, Programmer, ProgrammerStats, TaskAttachment,
+                     TaskTombstone, User, AttachmentUpload)
+from .serializers import (TaskSerializer, TaskListSerializer, UserSerializer,
+                          ProgrammerSerializer, TaskBulkItemSerializer,
+                          AttachmentUploadSerializer, TaskAttachmentSerializer)
+from .pagination import KeysetPagination
+from .filters import TaskFilterBackend
+from .mixins import ConditionalGetMixin
+from .media import schedule_processing
+from .authentication import QueryParamJWTAuthentication
+from django.db.models import Count, Max
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
@@ -29,39 +38,119 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     serializer_class = CustomTokenObtainPairSerializer
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+class TaskViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Task.objects.all().order_by('-created_at')
     serializer_class = TaskSerializer
     parser_classes = (MultiPartParser, FormParser, JSONParser)
+    pagination_class = KeysetPagination
+    filter_backends = (TaskFilterBackend, filters.OrderingFilter)
+    ordering_fields = ('queue_order', 'created_at', 'updated_at',
+                       'status', 'title')
+
+    def is_projected(self):
+        return (self.action == 'list'
+                and TaskListSerializer.is_requested(self.request.query_params))
+
+    def get_serializer_class(self):
+        if self.is_projected():
+            return TaskListSerializer
+        return TaskSerializer
 
     def get_queryset(self):
         user = self.request.user
-        if user.is_staff:
-            return Task.objects.all().order_by('queue_order', '-created_at')
-        return Task.objects.filter(assigned_to__user=user).order_by('queue_order', '-created_at')
+        if self.is_projected():
+            queryset = self.get_projected_queryset()
+        else:
+            # Fetch plan: programmer + user in the same query, attachments in
+            # one extra query, so the cost does not grow with the row count.
+            queryset = Task.objects.select_related(
+                'assigned_to__user').prefetch_related('attachments')
+        if not user.is_staff:
+            queryset = queryset.filter(assigned_to__user=user)
+        return queryset.order_by('queue_order', '-created_at')
+
+    def get_projected_queryset(self):
+        """Load only the columns and relations the requested fields need."""
+        params = self.request.query_params
+        fields = TaskListSerializer.get_selected_fields(params)
+        columns = TaskListSerializer.get_only_columns(fields)
+        # Keyset cursors read the ordering columns of the last row, and page
+        # validators read updated_at and the assignee of every row.
+        columns.update(('queue_order', 'created_at', 'updated_at', 'assigned_to'))
+        for name in params.get('ordering', '').split(','):
+            name = name.strip().lstrip('-')
+            if name in self.ordering_fields:
+                columns.add(name)
+
+        # assigned_to_name comes from the programmer name cache
+        queryset = Task.objects.only(*columns)
+        if 'attachments' in fields:
+            queryset = queryset.prefetch_related('attachments')
+        return queryset
+
+    def get_list_validators(self, queryset):
+        # Programmer timestamps are included because assigned_to_name is
+        # rendered from the linked user.
+        stats = queryset.order_by().aggregate(
+            last=Max('updated_at'), names=Max('assigned_to__updated_at'),
+            count=Count('id'))
+        return None, (stats['last'], stats['names'], stats['count'])
+
+    def get_page_validators(self, page):
+        # The page rows are already fetched; assignee timestamps come from
+        # one primary-key lookup instead of a join over the whole list.
+        assignees = {task.assigned_to_id for task in page if task.assigned_to_id}
+        names = sorted(Programmer.objects.filter(pk__in=assignees)
+                       .values_list('pk', 'updated_at'))
+        rows = [(task.pk, task.updated_at) for task in page]
+        return None, (rows, names)
+
+    def get_object_validators(self, obj):
+        last_modified = max(obj.updated_at, obj.assigned_to.updated_at)
+        return last_modified, (obj.pk, obj.updated_at,
+                               obj.assigned_to.updated_at)
+
+    # Upload field name -> TaskAttachment.file_type
+    attachment_fields = (('images', 'IMAGE'), ('videos', 'VIDEO'),
+                         ('audios', 'AUDIO'))
+
+    def _build_attachments(self, task, request, suffix=''):
+        """
+        Unsaved TaskAttachment rows for files uploaded as ``images<suffix>``
+        etc. File content is stored (or reused) as a deduplicated blob.
+        """
+        from . import blobs
+
+        attachments = []
+        for field, file_type in self.attachment_fields:
+            for upload in request.FILES.getlist(field + suffix):
+                blob = blobs.store(upload, upload.name)
+                attachments.append(TaskAttachment(
+                    task=task, file=blob.file.name, blob=blob,
+                    file_type=file_type, size=blob.size))
+        return attachments
 
     def _save_attachments(self, task, request):
-        """Save uploaded files as TaskAttachment records."""
-        images = request.FILES.getlist('images')
-        for img in images:
-            TaskAttachment.objects.create(
-                task=task, file=img, file_type='IMAGE')
-
-        videos = request.FILES.getlist('videos')
-        for vid in videos:
-            TaskAttachment.objects.create(
-                task=task, file=vid, file_type='VIDEO')
-
-        audios = request.FILES.getlist('audios')
-        for aud in audios:
-            TaskAttachment.objects.create(
-                task=task, file=aud, file_type='AUDIO')
+        """
+        Save uploaded files as TaskAttachment records. bulk_create sends no
+        post_save, so the task's updated_at (fragment key, validators, delta
+        sync) is bumped here, after the files are stored.
+        """
+        from django.utils import timezone
+
+        attachments = self._build_attachments(task, request)
+        if attachments:
+            TaskAttachment.objects.bulk_create(attachments)
+            schedule_processing(attachments)
+            task.updated_at = timezone.now()
+            Task.objects.filter(pk=task.pk).update(updated_at=task.updated_at)
 
     def perform_create(self, serializer):
         if not self.request.user.is_staff:
             from rest_framework.exceptions import PermissionDenied
             raise PermissionDenied("Faqat adminlar task yaratishi mumkin.")
 
+        from django.db import transaction
         from django.utils import timezone
         status = self.request.data.get('status', 'TODO')
 
@@ -71,33 +160,291 @@ class TaskViewSet(viewsets.ModelViewSet):
         else:
             extra_data['todo_at'] = timezone.now()
 
-        task = serializer.save(**extra_data)
-        self._save_attachments(task, self.request)
+        # The row and its attachments become visible together
+        with transaction.atomic():
+            programmer = serializer.validated_data.get('assigned_to')
+            if programmer and 'queue_order' not in serializer.validated_data:
+                # Append to the queue with a gap, like tasks/bulk/
+                Task.lock_queues([programmer.pk])
+                last = Task.queue_ends([programmer.pk]).get(programmer.pk) or 0
+                extra_data['queue_order'] = last + Task.QUEUE_GAP
+            task = serializer.save(**extra_data)
+            self._save_attachments(task, self.request)
 
     def perform_update(self, serializer):
-        task = serializer.save()
-        self._save_attachments(task, self.request)
+        from django.db import transaction
+
+        with transaction.atomic():
+            task = serializer.save()
+            self._save_attachments(task, self.request)
+
+    bulk_max_items = 500
+    bulk_batch_size = 100
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Create many tasks in one transaction.
+
+        Body: ``{"tasks": [{title, description, assigned_to, status}, ...]}``.
+        With multipart, ``tasks`` is a JSON string and files for item ``i`` are
+        sent as ``images_<i>``, ``videos_<i>``, ``audios_<i>``. Valid items are
+        created; invalid ones are reported under ``errors`` by index.
+        """
+        import json
+        from django.db import transaction
+        from django.utils import timezone
+        from .events import publish_task_event
+
+        if not request.user.is_staff:
+            return Response({'error': 'Faqat adminlar task yaratishi mumkin.'}, status=status.HTTP_403_FORBIDDEN)
+
+        items = request.data.get('tasks')
+        if isinstance(items, str):
+            try:
+                items = json.loads(items)
+            except ValueError:
+                items = None
+        if not isinstance(items, list) or not items:
+            return Response({'error': 'tasks ro\'yxati kiritilishi shart'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > self.bulk_max_items:
+            return Response({'error': f'Bir so\'rovda {self.bulk_max_items} tadan ko\'p task bo\'lmasligi kerak'}, status=status.HTTP_400_BAD_REQUEST)
+
+        errors = {}
+        valid = []
+        for index, item in enumerate(items):
+            serializer = TaskBulkItemSerializer(data=item)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                errors[index] = serializer.errors
+
+        programmer_ids = {data['assigned_to'] for _, data in valid}
+        with transaction.atomic():
+            # Locked until commit, so concurrent creates, requeues and moves
+            # cannot read the same queue end
+            existing = set(Task.lock_queues(programmer_ids))
+            for index, data in list(valid):
+                if data['assigned_to'] not in existing:
+                    errors[index] = {'assigned_to': ['Programmist topilmadi']}
+            valid = [(i, d) for i, d in valid if i not in errors]
+
+            # Append to the end of each programmer's active queue, keeping
+            # the submitted order.
+            last_orders = Task.queue_ends(existing)
+            now = timezone.now()
+            tasks = []
+            for _, data in valid:
+                programmer_id = data.pop('assigned_to')
+                if 'queue_order' not in data:
+                    last = last_orders.get(programmer_id) or 0
+                    data['queue_order'] = last_orders[programmer_id] = last + Task.QUEUE_GAP
+                timestamp_field = 'pending_at' if data['status'] == 'PENDING' else 'todo_at'
+                tasks.append(Task(assigned_to_id=programmer_id,
+                                  **{timestamp_field: now}, **data))
+            Task.objects.bulk_create(tasks, batch_size=self.bulk_batch_size)
+            ProgrammerStats.apply_moves(
+                [(None, (task.assigned_to_id, task.status)) for task in tasks])
+
+            attachments = []
+            for (index, _), task in zip(valid, tasks):
+                attachments += self._build_attachments(
+                    task, request, suffix=f'_{index}')
+            TaskAttachment.objects.bulk_create(
+                attachments, batch_size=self.bulk_batch_size)
+            schedule_processing(attachments)
+            if attachments:
+                # No post_save from bulk_create: stamp after the files exist
+                now = timezone.now()
+                with_files = {attachment.task_id for attachment in attachments}
+                Task.objects.filter(pk__in=with_files).update(updated_at=now)
+                for task in tasks:
+                    if task.pk in with_files:
+                        task.updated_at = now
+
+            for task in tasks:
+                publish_task_event(task, 'created')
+
+        created = [{'index': index, 'id': task.pk}
+                   for (index, _), task in zip(valid, tasks)]
+        response_status = status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST
+        return Response({'created': created, 'errors': errors}, status=response_status)
+
+    # Bulk action name -> target status
+    bulk_transitions = {'start': 'TODO', 'approve': 'APPROVED',
+                        'reject': 'REJECTED'}
+
+    @action(detail=False, methods=['post'], url_path='bulk-transition')
+    def bulk_transition(self, request):
+        """
+        Apply ``start``/``approve``/``reject`` to many tasks at once.
+
+        Body: ``{"action": "approve", "ids": [1, 2], "reason": "..."}``
+        (``reason`` only for reject). Returns an outcome per id: ``ok``,
+        ``conflict`` (status does not allow it) or ``not_found``.
+        """
+        from django.db import transaction
+
+        name = request.data.get('action')
+        if name not in self.bulk_transitions:
+            return Response({'error': f"action quyidagilardan biri bo'lishi kerak: {', '.join(self.bulk_transitions)}"}, status=status.HTTP_400_BAD_REQUEST)
+        if name != 'start' and not request.user.is_staff:
+            return Response({'error': 'Faqat adminlar bu amalni bajarishi mumkin'}, status=status.HTTP_403_FORBIDDEN)
+
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not ids:
+            return Response({'error': 'ids ro\'yxati kiritilishi shart'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            ids = [int(pk) for pk in ids]
+        except (TypeError, ValueError):
+            return Response({'error': 'ids faqat raqamlardan iborat bo\'lishi kerak'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(ids) > self.bulk_max_items:
+            return Response({'error': f'Bir so\'rovda {self.bulk_max_items} tadan ko\'p task bo\'lmasligi kerak'}, status=status.HTTP_400_BAD_REQUEST)
+
+        reason = (request.data.get('reason') or '').strip()
+        if name == 'reject' and not reason:
+            return Response({'error': 'Bekor qilish sababi kiritilishi shart!'}, status=status.HTTP_400_BAD_REQUEST)
+
+        visible = set(Task.objects.filter(pk__in=ids).filter(
+            **({} if request.user.is_staff else {'assigned_to__user': request.user})
+        ).values_list('pk', flat=True))
+
+        target = self.bulk_transitions[name]
+        extra = {'rejection_reason': reason} if name == 'reject' else {}
+        with transaction.atomic():
+            changed = Task.bulk_transition(visible, target, **extra)
+            if name == 'reject' and changed:
+                Task.bulk_requeue(changed, reason)
+
+        changed_ids = {task.pk for task in changed}
+        results = {
+            pk: 'ok' if pk in changed_ids else 'conflict' if pk in visible else 'not_found'
+            for pk in ids
+        }
+        return Response({'results': results})
+
+    search_max_results = 100
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Full-text search: ``?q=`` words, best matches first. Accepts the
+        list filters; ``?limit=`` caps the results (default 20).
+        """
+        from .search import get_search_backend
+
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'error': 'q parametri kerak'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = int(request.query_params.get('limit', 20))
+        except ValueError:
+            return Response({'error': 'limit butun son bo\'lishi kerak'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, self.search_max_results))
+
+        queryset = self.filter_queryset(self.get_queryset())
+        ids = get_search_backend(queryset.db).ranked_ids(queryset, query, limit)
+        tasks = self.get_queryset().in_bulk(ids)
+        serializer = self.get_serializer(
+            [tasks[pk] for pk in ids if pk in tasks], many=True)
+        return Response({'results': serializer.data})
+
+    @action(detail=False, methods=['get'])
+    def analytics(self, request):
+        """
+        Phase durations (seconds) of the filtered tasks: count, average,
+        p50 and p90 overall, per programmer and per week of creation.
+        Accepts the same filters as the list.
+        """
+        from .analytics import cycle_times
+
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(cycle_times(queryset))
+
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """
+        Delta sync: tasks created/updated after ``?since=``, and ids of tasks
+        deleted or reassigned away from the user since then.
+
+        Without ``since`` the whole visible list is returned. Either way the
+        response carries ``cursor`` to send as ``since`` on the next call:
+        an opaque, URL-safe token (microseconds since the epoch). ISO 8601
+        datetimes are still accepted as ``since``.
+
+        Writers stamp ``updated_at`` before they commit, so the cursor lags
+        the read by ``TASK_CHANGES_OVERLAP`` seconds: consecutive windows
+        overlap and a row committed late is still delivered. Clients may get
+        a task (or deleted id) twice and should apply changes by id.
+        """
+        from datetime import datetime, timedelta, timezone as dt_timezone
+
+        from django.conf import settings
+        from django.utils import timezone
+        from django.utils.dateparse import parse_datetime
+
+        epoch = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+        now = timezone.now()
+        cursor = now - timedelta(seconds=getattr(settings, 'TASK_CHANGES_OVERLAP', 30))
+        since = request.query_params.get('since')
+        if since:
+            try:
+                if since.isdigit():
+                    since = epoch + timedelta(microseconds=int(since))
+                else:
+                    since = parse_datetime(since)
+            except (ValueError, OverflowError):
+                since = None
+            if since is None:
+                return Response({'error': 'since noto\'g\'ri formatda'}, status=status.HTTP_400_BAD_REQUEST)
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+            retention = timedelta(days=getattr(settings, 'TASK_TOMBSTONE_RETENTION_DAYS', 30))
+            if since < now - retention:
+                # Tombstones that old may be pruned: deletions would be missed
+                return Response({'error': 'since juda eski, ro\'yxatni to\'liq qayta yuklang'}, status=status.HTTP_410_GONE)
+
+        changed = self.get_queryset()
+        deleted = TaskTombstone.objects.none()
+        if since:
+            changed = changed.filter(updated_at__gt=since)
+            deleted = TaskTombstone.objects.filter(deleted_at__gt=since)
+            if not request.user.is_staff:
+                deleted = deleted.filter(
+                    assigned_to_id=request.user.programmer_id)
+
+        changed = list(changed)
+        serializer = self.get_serializer(changed, many=True)
+        # A task reassigned away and back (or, for staff, just reassigned)
+        # has a tombstone but is still visible
+        changed_ids = {task.pk for task in changed}
+        deleted_ids = [pk for pk in deleted.values_list('task_id', flat=True).distinct()
+                       if pk not in changed_ids]
+        return Response({
+            'cursor': str((cursor - epoch) // timedelta(microseconds=1)),
+            'changed': serializer.data,
+            'deleted': deleted_ids,
+        })
+
+    def _transition_conflict(self, task):
+        return Response({'error': f'Task holati ({task.status}) bu amalga ruxsat bermaydi'}, status=status.HTTP_409_CONFLICT)
 
     @action(detail=True, methods=['post'])
     def start(self, request, pk=None):
-        from django.utils import timezone
         task = self.get_object()
         # Admin or assigned user can start
         if request.user.is_staff or (task.assigned_to and request.user == task.assigned_to.user):
-            task.status = 'TODO'
-            task.todo_at = timezone.now()
-            task.save()
+            if not task.transition_to('TODO'):
+                return self._transition_conflict(task)
             return Response({'status': 'Task boshlandi deb belgilandi'})
         return Response({'error': 'Siz bu taskni boshlay olmaysiz'}, status=status.HTTP_403_FORBIDDEN)
 
     @action(detail=True, methods=['post'])
     def complete(self, request, pk=None):
-        from django.utils import timezone
         task = self.get_object()
         if task.assigned_to and request.user == task.assigned_to.user:
-            task.status = 'DONE'
-            task.done_at = timezone.now()
-            task.save()
+            if not task.transition_to('DONE'):
+                return self._transition_conflict(task)
             return Response({'status': 'Task bajardi deb belgilandi'})
         return Response({'error': 'Siz bu taskni bajara olmaysiz'}, status=status.HTTP_403_FORBIDDEN)
 
@@ -105,11 +452,9 @@ class TaskViewSet(viewsets.ModelViewSet):
     def approve(self, request, pk=None):
         if not request.user.is_staff:
             return Response({'error': 'Faqat adminlar tasdiqlashi mumkin'}, status=status.HTTP_403_FORBIDDEN)
-        from django.utils import timezone
         task = self.get_object()
-        task.status = 'APPROVED'
-        task.approved_at = timezone.now()
-        task.save()
+        if not task.transition_to('APPROVED'):
+            return self._transition_conflict(task)
         return Response({'status': 'Task tasdiqlandi'})
 
     @action(detail=True, methods=['post'])
@@ -121,40 +466,181 @@ class TaskViewSet(viewsets.ModelViewSet):
         if not reason:
             return Response({'error': 'Bekor qilish sababi kiritilishi shart!'}, status=status.HTTP_400_BAD_REQUEST)
 
-        from django.utils import timezone
+        from django.db import transaction
         task = self.get_object()
-        task.status = 'REJECTED'
-        task.rejected_at = timezone.now()
-        task.rejection_reason = reason
-        task.save()
-
-        # Re-queue: create a new task for the same programmer after existing active tasks
-        programmer = task.assigned_to
-        # Find the last queue_order for this programmer's active tasks
-        active_tasks = Task.objects.filter(
-            assigned_to=programmer,
-            status__in=['PENDING', 'TODO']
-        ).order_by('-queue_order')
-        last_order = active_tasks.first().queue_order if active_tasks.exists() else 0
-
-        Task.objects.create(
-            title=task.title,
-            description=task.description,
-            assigned_to=programmer,
-            status='TODO',
-            todo_at=timezone.now(),
-            queue_order=last_order + 1,
-            rejection_reason=f"Qayta bajarish (sabab: {reason})"
-        )
+        with transaction.atomic():
+            # The conditional UPDATE comes first, so the write lock is held
+            # before the next queue slot is read.
+            if not task.transition_to('REJECTED', rejection_reason=reason):
+                return self._transition_conflict(task)
+            task.requeue(reason)
 
         return Response({'status': f'Task rad etildi va programmistga qayta yuborildi. Sabab: {reason}'})
 
 
-class ProgrammerViewSet(viewsets.ModelViewSet):
-    queryset = Programmer.objects.all()
+    @action(detail=True, methods=['post'])
+    def uploads(self, request, pk=None):
+        """Start a resumable attachment upload for this task."""
+        task = self.get_object()
+        if not (request.user.is_staff or (task.assigned_to and request.user == task.assigned_to.user)):
+            return Response({'error': 'Siz bu taskka fayl yuklay olmaysiz'}, status=status.HTTP_403_FORBIDDEN)
+        serializer = AttachmentUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(task=task, created_by=request.user)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['post'])
+    def move(self, request, pk=None):
+        """Move a task before/after a sibling: ``{"before": id}`` or ``{"after": id}``."""
+        from django.db import transaction
+        task = self.get_object()
+        if not (request.user.is_staff or (task.assigned_to and request.user == task.assigned_to.user)):
+            return Response({'error': 'Siz bu taskni ko\'chira olmaysiz'}, status=status.HTTP_403_FORBIDDEN)
+
+        after = 'after' in request.data
+        sibling_id = request.data.get('after' if after else 'before')
+        sibling = Task.objects.filter(
+            pk=sibling_id if str(sibling_id).isdigit() else None,
+            assigned_to_id=task.assigned_to_id).exclude(pk=task.pk).first()
+        if sibling is None:
+            return Response({'error': 'before yoki after uchun shu programmistning boshqa taski kerak'}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            queue_order = task.move(sibling, after=after)
+        return Response({'status': 'Task ko\'chirildi', 'queue_order': queue_order})
+
+
+class AttachmentUploadViewSet(mixins.RetrieveModelMixin,
+                              mixins.DestroyModelMixin,
+                              viewsets.GenericViewSet):
+    """
+    Resumable chunked uploads for task attachments.
+
+    1. ``POST tasks/{id}/uploads/`` with filename, file_type and size.
+    2. ``PATCH uploads/{id}/`` with raw bytes and an ``Upload-Offset``
+       header; repeat until ``offset == size``. ``GET uploads/{id}/`` tells
+       where to resume after a dropped connection.
+    3. ``POST uploads/{id}/complete/`` links the assembled file to the task.
+
+    Chunk bodies are never parsed: they are streamed from the request to the
+    part file in small blocks, so memory use does not depend on chunk size.
+    """
+    queryset = AttachmentUpload.objects.select_related('task')
+    serializer_class = AttachmentUploadSerializer
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.user.is_staff:
+            return queryset
+        return queryset.filter(created_by=self.request.user)
+
+    def partial_update(self, request, *args, **kwargs):
+        upload = self.get_object()
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except (KeyError, ValueError):
+            return Response({'error': 'Upload-Offset va Content-Length sarlavhalari kerak'}, status=status.HTTP_400_BAD_REQUEST)
+
+        if offset != upload.offset:
+            return Response({'error': 'Offset mos kelmadi', 'offset': upload.offset}, status=status.HTTP_409_CONFLICT)
+        if offset + length > upload.size:
+            return Response({'error': 'Fayl e\'lon qilingan hajmdan katta', 'offset': upload.offset}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not upload.write_chunk(request._request, offset, length):
+            upload.refresh_from_db(fields=['offset'])
+            return Response({'error': 'Offset mos kelmadi', 'offset': upload.offset}, status=status.HTTP_409_CONFLICT)
+        return Response({'offset': upload.offset, 'size': upload.size})
+
+    @action(detail=True, methods=['post'])
+    def complete(self, request, pk=None):
+        upload = self.get_object()
+        if not upload.is_complete:
+            return Response({'error': 'Yuklash hali tugamagan', 'offset': upload.offset}, status=status.HTTP_409_CONFLICT)
+        attachment = upload.assemble()
+        serializer = TaskAttachmentSerializer(
+            attachment, context={'request': request})
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+class PassthroughRenderer(renderers.JSONRenderer):
+    """
+    Lets file responses pass content negotiation for any Accept header.
+    Errors (401/404 ...) still carry a dict, which is rendered as JSON.
+    """
+    media_type = '*/*'
+    format = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None or isinstance(data, bytes):
+            return data
+        response = (renderer_context or {}).get('response')
+        if response is not None:
+            response['Content-Type'] = 'application/json'
+        return super().render(data, 'application/json', renderer_context)
+
+
+class TaskAttachmentViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = TaskAttachment.objects.select_related('task__assigned_to')
+    serializer_class = TaskAttachmentSerializer
+    authentication_classes = (QueryParamJWTAuthentication,)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.user.is_staff:
+            return queryset
+        return queryset.filter(task__assigned_to__user=self.request.user)
+
+    @action(detail=True, methods=['get'],
+            renderer_classes=[renderers.JSONRenderer, PassthroughRenderer])
+    def file(self, request, pk=None):
+        """
+        Stream the file (``?variant=thumbnail`` for the preview) with Range
+        support, after checking the requester may see the task.
+        """
+        from django.http import Http404
+        from .serving import serve_file
+
+        attachment = self.get_object()
+        field_file = (attachment.thumbnail
+                      if request.query_params.get('variant') == 'thumbnail'
+                      else attachment.file)
+        if not field_file:
+            raise Http404
+        try:
+            return serve_file(request._request, field_file)
+        except FileNotFoundError:
+            raise Http404
+
+
+class ProgrammerViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+    queryset = Programmer.objects.select_related('user')
     serializer_class = ProgrammerSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_list_validators(self, queryset):
+        stats = queryset.order_by().aggregate(
+            last=Max('updated_at'), count=Count('id'))
+        return None, (stats['last'], stats['count'])
+
+    def get_object_validators(self, obj):
+        return obj.updated_at, (obj.pk, obj.updated_at)
+
+    def list(self, request, *args, **kwargs):
+        """Served from the directory cache (tasks.directory)."""
+        from .directory import programmer_directory
+
+        def build():
+            queryset = self.filter_queryset(self.get_queryset())
+            return {
+                'validators': self.get_list_validators(queryset),
+                'results': list(self.get_serializer(queryset, many=True).data),
+            }
+
+        entry = programmer_directory(build)
+        return self.conditional_response(
+            request, entry['validators'], lambda: Response(entry['results']))
+
     def destroy(self, request, *args, **kwargs):
         if not request.user.is_staff:
             return Response({'error': 'Faqat adminlar programmistni o\'chira oladi'}, status=status.HTTP_403_FORBIDDEN)
@@ -168,6 +654,27 @@ class ProgrammerViewSet(viewsets.ModelViewSet):
         self.perform_destroy(instance)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        """Task counts per status for each programmer, read from ProgrammerStats."""
+        programmers = Programmer.objects.select_related('user', 'stats').order_by('pk')
+        if not request.user.is_staff:
+            programmers = programmers.filter(pk=request.user.programmer_id)
+
+        columns = [status.lower() for status, _ in Task.STATUS_CHOICES]
+        results = []
+        for programmer in programmers:
+            stats = getattr(programmer, 'stats', None)
+            counts = {column: getattr(stats, column, 0) if stats else 0
+                      for column in columns}
+            results.append({
+                'programmer': programmer.id,
+                'full_name': str(programmer),
+                **counts,
+                'total': sum(counts.values()),
+            })
+        return Response(results)
+
     @action(detail=False, methods=['post'], url_path='create-user')
     def create_user(self, request):
         if not request.user.is_staff:
@@ -194,3 +701,51 @@ class ProgrammerViewSet(viewsets.ModelViewSet):
             serializer.save()
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+async def task_events(request):
+    """
+    Server-sent events stream of task lifecycle events.
+
+    EventSource cannot set headers, so the access token may also be passed
+    as ``?token=``. Programmers only receive events for their own tasks.
+    Needs an ASGI server (``core.asgi``) to hold connections open cheaply.
+    """
+    import asyncio
+    import json
+    from asgiref.sync import sync_to_async
+    from django.http import JsonResponse, StreamingHttpResponse
+    from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
+    from .events import get_broker, visible_to
+
+    try:
+        result = await sync_to_async(
+            QueryParamJWTAuthentication().authenticate)(request)
+    except (InvalidToken, AuthenticationFailed):
+        return JsonResponse({'error': 'Token yaroqsiz'}, status=401)
+    if result is None:
+        return JsonResponse({'error': 'Token kiritilmagan'}, status=401)
+    user = result[0]
+
+    broker = get_broker()
+    heartbeat = 25
+
+    async def stream():
+        subscription = broker.subscribe(visible_to(user))
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=heartbeat)
+                except asyncio.TimeoutError:
+                    yield ': ping\n\n'
+                    continue
+                yield f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            broker.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
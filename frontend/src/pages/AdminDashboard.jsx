@@ -65,8 +65,11 @@ const AdminDashboard = () => {
 
     const getFileUrl = (path) => {
         if (!path) return '';
-        if (path.startsWith('http')) return path;
-        return `${API_URL}${path}`;
+        const url = path.startsWith('http') ? path : `${API_URL}${path}`;
+        // <img>/<video> send no Authorization header; the file endpoint accepts ?token=
+        const token = localStorage.getItem('access_token');
+        if (!token || !url.includes('/api/attachments/')) return url;
+        return `${url}${url.includes('?') ? '&' : '?'}token=${encodeURIComponent(token)}`;
     };
 
     const openTaskDetail = async (task) => {
@@ -95,7 +98,8 @@ const AdminDashboard = () => {
         formData.append('title', newTask.title);
         formData.append('description', newTask.description);
         formData.append('assigned_to', newTask.assigned_to);
-        formData.append('status', newTask.status);
+        // Status of an existing task only changes through the workflow actions
+        if (!editingTask) formData.append('status', newTask.status);
 
         newTask.images.forEach(file => {
             if (file instanceof File) formData.append('images', file);
@@ -679,7 +683,7 @@ const AdminDashboard = () => {
                                 </div>
                                 <div>
                                     <label>Status</label>
-                                    <select value={newTask.status} onChange={(e) => setNewTask({ ...newTask, status: e.target.value })}>
+                                    <select value={newTask.status} disabled={!!editingTask} onChange={(e) => setNewTask({ ...newTask, status: e.target.value })}>
                                         <option value="TODO">Todo</option>
                                         <option value="PENDING">Pending</option>
                                         {editingTask && (
@@ -25,7 +25,8 @@ const ProgrammerDashboard = () => {
     const fetchTasks = async () => {
         const res = await api.get('tasks/');
         setTasks(res.data);
-        const found = res.data.find(t => t.status === 'TODO' || t.status === 'REJECTED');
+        // A rejected task is closed; its rework copy is a new TODO task
+        const found = res.data.find(t => t.status === 'TODO');
         if (found) fetchActiveTaskDetail(found.id);
     };
 
@@ -39,19 +40,31 @@ const ProgrammerDashboard = () => {
     };
 
     const completeTask = async (id) => {
-        await api.post(`tasks/${id}/complete/`);
+        try {
+            await api.post(`tasks/${id}/complete/`);
+        } catch (error) {
+            // 409: the task is no longer in a state that allows it
+            alert(error.response?.data?.error || 'Xatolik yuz berdi!');
+        }
         fetchTasks();
     };
 
     const startTask = async (id) => {
-        await api.post(`tasks/${id}/start/`);
+        try {
+            await api.post(`tasks/${id}/start/`);
+        } catch (error) {
+            alert(error.response?.data?.error || 'Xatolik yuz berdi!');
+        }
         fetchTasks();
     };
 
     const getFileUrl = (path) => {
         if (!path) return '';
-        if (path.startsWith('http')) return path;
-        return `${API_URL}${path}`;
+        const url = path.startsWith('http') ? path : `${API_URL}${path}`;
+        // <img>/<video> send no Authorization header; the file endpoint accepts ?token=
+        const token = localStorage.getItem('access_token');
+        if (!token || !url.includes('/api/attachments/')) return url;
+        return `${url}${url.includes('?') ? '&' : '?'}token=${encodeURIComponent(token)}`;
     };
 
     const openTaskDetail = async (task) => {
@@ -73,7 +86,7 @@ const ProgrammerDashboard = () => {
         }
     };
 
-    const activeTask = tasks.find(t => t.status === 'TODO' || t.status === 'REJECTED');
+    const activeTask = tasks.find(t => t.status === 'TODO');
 
     return (
         <div className="container" style={{ maxWidth: '1000px' }}>
@@ -250,7 +263,7 @@ const ProgrammerDashboard = () => {
                                 </button>
                             )}
 
-                            {(selectedTask.status === 'TODO' || selectedTask.status === 'REJECTED') && (
+                            {selectedTask.status === 'TODO' && (
                                 <button className="btn-success" style={{ flex: 1 }} onClick={() => { completeTask(selectedTask.id); setSelectedTask(null); }}>
                                     Bajardim deb belgilash (Complete)
                                 </button>